@@ -1,9 +1,22 @@
 from interfaces.VerificationStrategyInterface import VerificationStrategyInterface
 from interfaces.Function import Function
+from interfaces.NotImprovableException import NotImprovableException
 
 
-def improve_function(function: Function, verification_strategy: VerificationStrategyInterface):
+def improve_function(function: Function, verification_strategy: VerificationStrategyInterface,
+                     confirm_with_full_suite: bool = False, confirm_with_full_lint: bool = False):
     function.initial_refactor()
-    verification_strategy.verify_linting(function)
-    verification_strategy.verify_tests(function)
+    verification_strategy.verify_linting_and_tests(function)
     verification_strategy.verify_improvement(function)
+
+    if confirm_with_full_lint:
+        # cross-file rules are not checked when only the file of the function is linted
+        lint_errors = function.get_lint_errors(full=True)
+        if len(lint_errors) > 0:
+            raise NotImprovableException(function, "failed linting: {} error(s) in full lint".format(len(lint_errors)))
+
+    if confirm_with_full_suite and function.project.test_impact_map is not None:
+        # only the tests covering the function ran so far
+        test_errors = function.get_test_errors(full_suite=True)
+        if len(test_errors) > 0:
+            raise NotImprovableException(function, "failed tests: {} error(s) in full suite".format(len(test_errors)))
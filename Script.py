@@ -4,13 +4,27 @@ from llm_wrappers.GoogleTokenCounter import GoogleTokenCounter
 from llm_wrappers.OllamaModelWrapper import OllamaModelWrapper
 from llm_wrappers.OpenAIAPIWrapper import OpenAIAPIWrapper
 from llm_wrappers.OpenAIModelWrapper import OpenAIModelWrapper
+from llm_wrappers.ClientPool import set_max_concurrent_requests
+from llm_wrappers.ResponseCache import ResponseCache, set_response_cache
 from prompt_strategies.ChoiEtAl import ChoiEtAl as ChoiEtAlPrompt
 from prompt_strategies.Scheibe import Scheibe
 from verification_strategies.ChoiEtAl import ChoiEtAl as ChoiEtAlVerification
 from util.Logger import get_logger, add_log_file_handler, reset_logger
 from util.CSVWriter import save_time_entries_to_csv
-from helpers.LizardHelper import compute_cyclomatic_complexity, get_functions_sorted_by_complexity, compute_avg_cc
+from helpers.ComplexityIndex import ComplexityIndex
+from helpers.CandidateSnapshot import CandidateSnapshot, load_candidate_snapshot
 from helpers.GitHelper import save_git_diff_patch
+from helpers.LineRangeIndex import LineRangeIndex
+from helpers.CoverageHelper import load_test_impact_map
+from helpers.BaselineHelper import load_baseline
+from helpers.FileCache import set_mmap_enabled
+from helpers.ProjectHelper import (
+    set_node_modules_cache_dir, set_eslint_server_enabled, set_test_daemon_enabled, set_max_test_failures,
+    set_command_timeouts, DEFAULT_COMMAND_TIMEOUT
+)
+from helpers.StreamingProcess import CommandTimeoutError
+from helpers.TestSharding import set_shard_count
+from helpers.VerificationCache import VerificationCache
 from Refactorer import improve_function
 from interfaces.Function import Function
 from interfaces.LizardResult import LizardResult
@@ -23,6 +37,10 @@ import os
 from interfaces.TimeSeriesEntry import TimeEntry, Result
 from git import Repo
 import traceback
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from queue import Queue
+from typing import TypedDict
 import argparse
 import importlib.util
 import re
@@ -48,27 +66,28 @@ def build_model_wrapper(model: str, log_path: str) -> LLMWrapperInterface:
 def create_time_series_entry(function: Function, llm_wrapper: LLMWrapperInterface, 
                             idx: int, time_series: list[TimeEntry], result: Result,
                             prompt_strategy: PromptStrategyInterface,
-                            verification_strategy: VerificationStrategyInterface) -> TimeEntry:
+                            verification_strategy: VerificationStrategyInterface,
+                            complexity_index: ComplexityIndex,
+                            snapshot: CandidateSnapshot,
+                            discarded_tokens: tuple[int, int] = (0, 0)) -> TimeEntry:
     
     project = function.project
     
-    if idx == 1:
-        old_functions = compute_cyclomatic_complexity(project.path + project.code_dir)
-        original_avg_project_cc = compute_avg_cc(old_functions)
-        
-        old_prj_cc = original_avg_project_cc
-        old_fn_count = len(old_functions)
-        old_avg_nloc = sum(fun.nloc for fun in old_functions) / len(old_functions)
+    # candidates failing before their function was created have no entry, so idx can run ahead of time_series
+    if len(time_series) == 0:
+        old_prj_cc = snapshot.baseline_avg_cc
+        old_fn_count = snapshot.baseline_fn_count
+        old_avg_nloc = snapshot.baseline_avg_nloc
     else:
-        old_prj_cc = time_series[idx-2]['new_prj_avg_cc']
-        old_fn_count = time_series[idx-2]['new_fn_count']
-        old_avg_nloc = time_series[idx-2]['new_avg_nloc']
+        old_prj_cc = time_series[-1]['new_prj_avg_cc']
+        old_fn_count = time_series[-1]['new_fn_count']
+        old_avg_nloc = time_series[-1]['new_avg_nloc']
 
 
-    new_functions = compute_cyclomatic_complexity(project.target_path + project.code_dir)
-    new_prj_cc = compute_avg_cc(new_functions)
-    new_fn_count = len(new_functions)
-    new_avg_nloc = sum(fun.nloc for fun in new_functions) / len(new_functions)
+    complexity_index.update_file(function.target_path)
+    new_prj_cc = complexity_index.avg_cc
+    new_fn_count = complexity_index.fn_count
+    new_avg_nloc = complexity_index.avg_nloc
     
     sent_tokens = llm_wrapper.sent_tokens_count
     received_tokens = llm_wrapper.received_tokens_count
@@ -92,28 +111,182 @@ def create_time_series_entry(function: Function, llm_wrapper: LLMWrapperInterfac
         'new_avg_nloc': new_avg_nloc,
         'sent_tokens': sent_tokens,
         'received_tokens': received_tokens,
-        'result': result
+        'result': result,
+        'discarded_sent_tokens': discarded_tokens[0],
+        'discarded_received_tokens': discarded_tokens[1],
+        'cached_sent_tokens': llm_wrapper.cached_sent_tokens_count,
+        'cached_received_tokens': llm_wrapper.cached_received_tokens_count
     }
     return entry
 
-def has_overlapping_function_already_improved(improved_functions: list[Function], lizard_result: LizardResult) -> bool:
+def has_overlapping_function_already_improved(improved_ranges: LineRangeIndex, lizard_result: LizardResult) -> bool:
+    return improved_ranges.overlaps(lizard_result.filename, lizard_result.start_line, lizard_result.end_line)
+
+class RefactoringOutcome(TypedDict):
+    idx: int
+    lizard_result: LizardResult
+    function: Function | None
+    llm_wrapper: LLMWrapperInterface | None
+    result: Result
+    error: BaseException | None
+    workspace: 'WorkerWorkspace'
+
+
+class WorkerWorkspace:
+    """A dirty workspace in which one function at a time is refactored and verified.
+    Improvements verified in other workspaces are applied to it before it starts with the next function."""
+
+    def __init__(self, project: ProjectInterface):
+        self.project = project
+        self.__pending_functions: list[Function] = []
+        self.__lock = threading.Lock()
+
+    def add_improved_function(self, function: Function) -> None:
+        with self.__lock:
+            self.__pending_functions.append(function)
+
+    def sync(self) -> None:
+        with self.__lock:
+            pending_functions, self.__pending_functions = self.__pending_functions, []
+        for function in pending_functions:
+            function.apply_changes_to_workspace(self.project.dirty_path)
+
+
+def create_worker_workspaces(project: ProjectInterface, workers: int) -> list[WorkerWorkspace]:
+    projects = [project] + [project.create_worker_copy(worker_id) for worker_id in range(2, workers + 1)]
+    for worker_project in projects:
+        # created one after another, provisioning several workspaces of the same repository at once may conflict
+        worker_project.dirty_path
+    return [WorkerWorkspace(worker_project) for worker_project in projects]
+
+
+def are_overlapping(lizard_result: LizardResult, other: LizardResult) -> bool:
+    return other.filename == lizard_result.filename and \
+        other.start_line <= lizard_result.end_line and lizard_result.start_line <= other.end_line
+
+
+def overlaps_unrecorded_function(unrecorded: dict[int, LizardResult], lizard_result: LizardResult) -> bool:
+    return any(are_overlapping(lizard_result, other) for other in unrecorded.values())
+
+
+def get_conversation_log_path(log_dir: str, project: ProjectInterface, idx: int) -> str:
+    return log_dir + "/conversations/" + project.name + "-" + str(idx) + ".json"
+
+
+def prefetch_initial_refactor(lizard_result: LizardResult, conversation_log_path: str, model: str,
+                              prompt_strategy: PromptStrategyInterface,
+                              snapshot: CandidateSnapshot) -> tuple[LLMWrapperInterface, str]:
+    """Sends the initial prompt for a candidate ahead of time, while other functions are being verified"""
+    llm_wrapper = build_model_wrapper(model, conversation_log_path)
+    prompt = prompt_strategy.initial_prompt(snapshot.get_code(lizard_result))
+    response = llm_wrapper.send_message(prompt)
+    return llm_wrapper, response
+
+
+def discard_prefetch(prefetch: Future, lizard_result: LizardResult, conversation_log_path: str) -> tuple[int, int]:
+    """Waits for a prefetched request that is not needed anymore and returns its sent and received tokens"""
+    try:
+        llm_wrapper, _ = prefetch.result()
+    except Exception:
+        return 0, 0
+
+    get_logger().info("Discarding prefetched refactoring of " + lizard_result.long_name)
+    if os.path.exists(conversation_log_path):
+        os.replace(conversation_log_path, conversation_log_path.replace(".json", "-discarded.json"))
+    return llm_wrapper.sent_tokens_count, llm_wrapper.received_tokens_count
+
+
+def refactor_candidate(workspace: WorkerWorkspace, lizard_result: LizardResult, idx: int, log_dir: str,
+                       model: str, prompt_strategy: PromptStrategyInterface,
+                       verification_strategy: VerificationStrategyInterface,
+                       snapshot: CandidateSnapshot,
+                       prefetch: Future | None = None,
+                       confirm_with_full_suite: bool = False,
+                       confirm_with_full_lint: bool = False) -> RefactoringOutcome:
+    workspace.sync()
+    project = workspace.project
+
+    function: Function | None = None
+    llm_wrapper: LLMWrapperInterface | None = None
+    prefetched_response: str | None = None
+    error: BaseException | None = None
+    try:
+        if prefetch is not None:
+            try:
+                llm_wrapper, prefetched_response = prefetch.result()
+            except Exception as e:
+                get_logger().info("Prefetching function #" + str(idx) + " failed, sending initial prompt again: " + str(e))
+
+        if llm_wrapper is None:
+            llm_wrapper = build_model_wrapper(model, get_conversation_log_path(log_dir, project, idx))
+        function = Function(lizard_result, project,
+                            llm_wrapper, prompt_strategy,
+                            code=snapshot.get_code(lizard_result),
+                            prefetched_response=prefetched_response)
+        get_logger().info("Refactoring function #" + str(idx) + 
+                            ": " + lizard_result.long_name +
+                            " from file " + function.relative_path +
+                            " with CC: " + str(function.old_cc))
+
+        improve_function(function, verification_strategy, confirm_with_full_suite, confirm_with_full_lint)
+
+        result: Result = 'success'
+        get_logger().info("Function #" + str(idx) + " successfully improved")
+
+    except NotImprovableException as e:
+        get_logger().info("Disregarding function #" + str(idx) + " due to " + e.reason)
+        result = e.reason
+        function.restore_original_code()
+
+    except CommandTimeoutError as e:
+        get_logger().info("Disregarding function #" + str(idx) + " due to timeout: " + str(e))
+        result = 'timeout'
+        if function is not None:
+            function.restore_original_code()
 
-    if len(improved_functions) == 0: return False
+    except Exception as e:
+        get_logger().error(e)
+        get_logger().error(traceback.format_exc())
+        get_logger().info("Disregarding function #" + str(idx) + " due to other error")
+        result = 'other error'
+        error = e
+        if function is not None:
+            function.restore_original_code()
 
-    improved_functions_on_the_same_file = list(filter(lambda f: f.lizard_result.filename == lizard_result.filename, improved_functions))
+    return {
+        'idx': idx,
+        'lizard_result': lizard_result,
+        'function': function,
+        'llm_wrapper': llm_wrapper,
+        'result': result,
+        'error': error,
+        'workspace': workspace
+    }
 
-    if len(improved_functions_on_the_same_file) > 0:
-        for prev_improved_function in improved_functions_on_the_same_file:
-            if prev_improved_function.contains_lines(lizard_result.start_line, lizard_result.end_line):
-                return True
-    return False
 
 def main(project: ProjectInterface,
          prompt_strategy: PromptStrategyInterface = ChoiEtAlPrompt(),
          verification_strategy: VerificationStrategyInterface = ChoiEtAlVerification(),
          model: str = "gpt-4o-mini",
          base_log_dir: str = "logs/",
-         iterations: int = 20) -> None:
+         iterations: int = 20,
+         lizard_workers: int = 1,
+         cache_dir: str = "cache/",
+         workers: int = 1,
+         prefetch: bool = False,
+         test_impact: bool = False,
+         baseline: bool = False,
+         eslint_server: bool = False,
+         confirm_full_lint: bool = False,
+         test_daemon: bool = False,
+         max_test_failures: int | None = None,
+         timeout_factor: float = 3.0,
+         timeout_slack: float = 30.0,
+         test_shards: int = 1,
+         verification_cache: bool = False,
+         llm_cache: str = 'off',
+         max_concurrent_requests: int | None = None,
+         confirm_full_suite: bool = False) -> None:
 
     reset_logger()
     log_dir = prepare_log_dir(project.name, base_log_dir)
@@ -124,92 +297,191 @@ def main(project: ProjectInterface,
     get_logger().info("Prompt strategy: " + prompt_strategy.name)
     get_logger().info("Verification strategy: " + verification_strategy.name)
 
-    complexity_info = compute_cyclomatic_complexity(project.path + project.code_dir)
-    most_complex = get_functions_sorted_by_complexity(complexity_info)
+    set_node_modules_cache_dir(os.path.join(cache_dir, 'node_modules'))
+    if llm_cache != 'off':
+        set_response_cache(ResponseCache(os.path.join(cache_dir, 'llm-responses.sqlite'), llm_cache))
+        get_logger().info("LLM response cache: " + llm_cache)
+    else:
+        set_response_cache(None)
+    set_max_concurrent_requests(max_concurrent_requests)
+    set_eslint_server_enabled(eslint_server)
+    set_test_daemon_enabled(test_daemon)
+    snapshot = load_candidate_snapshot(project, cache_dir, lizard_workers)
+    most_complex = snapshot.candidates()
 
     improved_functions: list[Function] = list()
+    improved_ranges = LineRangeIndex()
     disregarded_functions: list[Function] = list()
 
     repo = Repo(project.target_path)
+    complexity_index = ComplexityIndex(project.target_path + project.code_dir,
+                                       functions=snapshot.functions_in(project.target_path))
+    set_command_timeouts(DEFAULT_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT)
+    if baseline:
+        project.baseline = load_baseline(project, snapshot, cache_dir)
+        lint_timeout = timeout_factor * project.baseline.lint_duration + timeout_slack
+        test_timeout = timeout_factor * project.baseline.test_duration + timeout_slack
+        set_command_timeouts(lint_timeout, test_timeout)
+        get_logger().info("Timeouts: lint {:.0f}s, tests {:.0f}s".format(lint_timeout, test_timeout))
+    if max_test_failures is not None and project.baseline is not None:
+        # failing tests of the baseline are dropped afterwards, the rest has to reach the limit
+        max_test_failures += project.baseline.test_error_count
+    set_max_test_failures(max_test_failures)
+    set_shard_count(test_shards)
+    if verification_cache:
+        project.verification_cache = VerificationCache(project.path, snapshot.commit)
+    if test_impact:
+        # before the worker copies are created, they share the map with the project
+        project.test_impact_map = load_test_impact_map(project, project.dirty_path, cache_dir)
+    workspaces = create_worker_workspaces(project, workers)
+    free_workspaces: Queue[WorkerWorkspace] = Queue()
+    for workspace in workspaces:
+        free_workspaces.put(workspace)
+
+    def run_in_free_workspace(lizard_result: LizardResult, idx: int, prefetch: Future | None) -> RefactoringOutcome:
+        workspace = free_workspaces.get()
+        try:
+            return refactor_candidate(workspace, lizard_result, idx, log_dir, model,
+                                      prompt_strategy, verification_strategy, snapshot, prefetch,
+                                      confirm_full_suite, eslint_server and confirm_full_lint)
+        finally:
+            free_workspaces.put(workspace)
 
     time_series: list[TimeEntry] = []
-    
     consecutive_exception_count = 0
-    was_keyboard_interrupt_raised = False
-    idx = 0
-    for lizard_result in most_complex:
 
-        if idx >= iterations:
-            break
+    def record(outcome: RefactoringOutcome, discarded_tokens: tuple[int, int]) -> None:
+        nonlocal consecutive_exception_count
+        function = outcome['function']
+        idx = outcome['idx']
 
-        if has_overlapping_function_already_improved(improved_functions, lizard_result):
-            get_logger().info("Ignoring function " + lizard_result.long_name +
-                                " from file " + function.relative_path +
-                                " because overlapping function has already been improved.")
-            continue
-
-        idx = idx + 1
-        result: Result | None = None
-        try:
-            llm_wrapper_logpath = log_dir + \
-                "/conversations/" + project.name + "-" + str(idx) + ".json"
-            llm_wrapper: LLMWrapperInterface = build_model_wrapper(model, llm_wrapper_logpath)
-            function = Function(lizard_result, project,
-                                llm_wrapper, prompt_strategy)
-            get_logger().info("Refactoring function #" + str(idx) + 
-                                ": " + lizard_result.long_name +
-                                " from file " + function.relative_path +
-                                " with CC: " + str(function.old_cc))
-
-            improve_function(function, verification_strategy)
-
-            result = 'success'
-            get_logger().info("Function successfully improved")
+        if outcome['result'] == 'success':
             function.apply_changes_to_target()
             improved_functions.append(function)
+            improved_ranges.add(function.lizard_result.filename,
+                                function.lizard_result.start_line, function.lizard_result.end_line)
             save_git_diff_patch(repo, function, log_dir, idx)
+            for workspace in workspaces:
+                if workspace is not outcome['workspace']:
+                    workspace.add_improved_function(function)
             consecutive_exception_count = 0
+        else:
+            if outcome['error'] is not None:
+                consecutive_exception_count += 1
+            if function is not None:
+                disregarded_functions.append(function)
+
+        if function is not None:
+            entry = create_time_series_entry(function=function, llm_wrapper=outcome['llm_wrapper'], 
+                                            idx=idx, time_series=time_series, 
+                                            result=outcome['result'],
+                                            prompt_strategy=prompt_strategy,
+                                            verification_strategy=verification_strategy,
+                                            complexity_index=complexity_index,
+                                            snapshot=snapshot,
+                                            discarded_tokens=discarded_tokens)
+            time_series.append(entry)
+            csv_path = log_dir + "/" + project.name + ".csv"
+            save_time_entries_to_csv(csv_path, time_series)
+
+            get_logger().info("Old CC of function: " + str(entry['old_cc']))
+            get_logger().info("New CC of function: " + str(entry['new_cc']))
+            get_logger().info("Old avg CC of project: " + str(entry['old_prj_avg_cc']))
+            get_logger().info("New avg CC of project: " + str(entry['new_prj_avg_cc']))
+            get_logger().info("LLM-processed tokens: " + str(entry['sent_tokens'] 
+                                + entry['received_tokens']))
+            if entry['discarded_sent_tokens'] + entry['discarded_received_tokens'] > 0:
+                get_logger().info("Tokens of discarded prefetch: " + str(entry['discarded_sent_tokens']
+                                    + entry['discarded_received_tokens']))
+
+        if consecutive_exception_count >= 3:
+            raise outcome['error']
+
+    # Candidates are numbered in the order they are taken from the ranking and recorded in that order.
+    # A candidate overlapping a function that is still being refactored waits until that function is recorded,
+    # so which candidates are skipped does not depend on which worker finishes first.
+    unrecorded: dict[int, LizardResult] = {}
+    finished: dict[int, RefactoringOutcome] = {}
+    running: dict[Future, int] = {}
+    held_candidate: LizardResult | None = None
+    # with prefetching, the held candidate is the next one to start and its initial prompt is already being sent
+    held_prefetch: Future | None = None
+    next_idx_to_record = 1
+    idx = 0
 
-        except NotImprovableException as e:
-            get_logger().info("Disregarding function due to " + e.reason)
-            result = e.reason
-            function.restore_original_code()
-            disregarded_functions.append(function)
-
-        except KeyboardInterrupt:
-            was_keyboard_interrupt_raised = True
-            raise
-
-        except BaseException as e:
-            ++consecutive_exception_count
-            get_logger().error(e)
-            get_logger().error(traceback.format_exc())
-            get_logger().info("Disregarding function due to other error")
-
-            if consecutive_exception_count >= 3:
-                raise e
-
-            function.restore_original_code()
-            disregarded_functions.append(function)
-
-        finally:
-            if not was_keyboard_interrupt_raised:
-                entry = create_time_series_entry(function=function, llm_wrapper=llm_wrapper, 
-                                                idx=idx, time_series=time_series, 
-                                                result=result if result is not None else 'other error',
-                                                prompt_strategy=prompt_strategy,
-                                                verification_strategy=verification_strategy)
-                time_series.append(entry)
-                csv_path = log_dir + "/" + project.name + ".csv"
-                save_time_entries_to_csv(csv_path, time_series)
-
-                get_logger().info("Old CC of function: " + str(entry['old_cc']))
-                get_logger().info("New CC of function: " + str(entry['new_cc']))
-                get_logger().info("Old avg CC of project: " + str(entry['old_prj_avg_cc']))
-                get_logger().info("New avg CC of project: " + str(entry['new_prj_avg_cc']))
-                get_logger().info("LLM-processed tokens: " + str(entry['sent_tokens'] 
-                                    + entry['received_tokens']))
-            
+    def next_candidate() -> LizardResult | None:
+        for lizard_result in most_complex:
+            if has_overlapping_function_already_improved(improved_ranges, lizard_result):
+                get_logger().info("Ignoring function " + lizard_result.long_name +
+                                    " from file " + lizard_result.filename.replace(project.path + "/", "") +
+                                    " because overlapping function has already been improved.")
+                continue
+            return lizard_result
+        return None
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    prefetch_executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        while True:
+            while len(running) < workers and idx < iterations:
+                if held_candidate is not None:
+                    lizard_result, candidate_prefetch = held_candidate, held_prefetch
+                    held_candidate, held_prefetch = None, None
+                else:
+                    lizard_result, candidate_prefetch = next_candidate(), None
+                if lizard_result is None:
+                    break
+
+                if overlaps_unrecorded_function(unrecorded, lizard_result):
+                    held_candidate, held_prefetch = lizard_result, candidate_prefetch
+                    break
+
+                idx = idx + 1
+                unrecorded[idx] = lizard_result
+                running[executor.submit(run_in_free_workspace, lizard_result, idx, candidate_prefetch)] = idx
+
+            if prefetch and idx < iterations:
+                if held_candidate is None:
+                    held_candidate = next_candidate()
+                if held_candidate is not None and held_prefetch is None:
+                    held_prefetch = prefetch_executor.submit(
+                        prefetch_initial_refactor, held_candidate, get_conversation_log_path(log_dir, project, idx + 1),
+                        model, prompt_strategy, snapshot)
+
+            if len(running) == 0:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[running.pop(future)] = future.result()
+
+            while next_idx_to_record in finished:
+                outcome = finished.pop(next_idx_to_record)
+
+                discarded_tokens = (0, 0)
+                if outcome['result'] == 'success' and held_candidate is not None and \
+                        are_overlapping(outcome['lizard_result'], held_candidate):
+                    get_logger().info("Ignoring function " + held_candidate.long_name +
+                                        " from file " + held_candidate.filename.replace(project.path + "/", "") +
+                                        " because overlapping function has already been improved.")
+                    if held_prefetch is not None:
+                        discarded_tokens = discard_prefetch(held_prefetch, held_candidate,
+                                                            get_conversation_log_path(log_dir, project, idx + 1))
+                    held_candidate, held_prefetch = None, None
+
+                record(outcome, discarded_tokens)
+                del unrecorded[next_idx_to_record]
+                next_idx_to_record += 1
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    prefetch_executor.shutdown()
+
+    if project.verification_cache is not None:
+        get_logger().info("Verification cache: {} hit(s), {} miss(es)".format(
+            project.verification_cache.hits, project.verification_cache.misses))
 
 
 def read_args():
@@ -222,6 +494,46 @@ def read_args():
     parser.add_argument("--model", type=str, choices=['gpt-4o-mini', 'gpt-4.1-mini', 'gemini-2.5-flash', 'gpt-5-mini', 'deepseek-r1:1.5b'], default='gpt-4o-mini')
     parser.add_argument("--base-log-dir", type=str, default="logs/")
     parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--lizard-workers", type=int, default=1,
+                        help="Number of processes used to analyze the project with lizard")
+    parser.add_argument("--cache-dir", type=str, default="cache/",
+                        help="Directory for data shared across runs, e. g. candidate snapshots and installed node_modules")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of functions refactored and verified at the same time, each in its own dirty workspace")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Send the initial prompt for the next candidate while the current ones are being verified")
+    parser.add_argument("--mmap-file-cache", action="store_true",
+                        help="Map source files into memory instead of reading them when extracting functions")
+    parser.add_argument("--test-impact", action="store_true",
+                        help="Collect the coverage of each test file once and only run the tests covering the refactored function")
+    parser.add_argument("--confirm-full-suite", action="store_true",
+                        help="With --test-impact, run the full suite before a change is applied to the target")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Lint and test the untouched project once per commit and ignore the errors it already has")
+    parser.add_argument("--eslint-server", action="store_true",
+                        help="Only lint the file of the refactored function, through an ESLint server kept running per workspace")
+    parser.add_argument("--confirm-full-lint", action="store_true",
+                        help="With --eslint-server, lint the whole project before a change is applied to the target")
+    parser.add_argument("--test-daemon", action="store_true",
+                        help="Run mocha suites in a test runner kept warm per workspace, reloading only changed modules")
+    parser.add_argument("--max-test-failures", type=int, default=None,
+                        help="Stop a test run once this many failures were reported (only the first 10 are sent to the LLM)")
+    parser.add_argument("--concurrent-verification", action="store_true",
+                        help="Lint and test the refactored code at the same time")
+    parser.add_argument("--verification-cache", action="store_true",
+                        help="Reuse lint and test results when the dirty workspace returns to a state that was verified before")
+    parser.add_argument("--llm-cache", type=str, choices=['off', 'read-through', 'replay'], default='off',
+                        help="Store LLM responses in the cache dir and reuse them; with replay, "
+                             "a prompt without a stored response is an error")
+    parser.add_argument("--max-concurrent-requests", type=int, default=None,
+                        help="Maximum number of LLM requests in flight across workers and prefetching (default: no limit)")
+    parser.add_argument("--test-shards", type=int, default=1,
+                        help="Split the test files of projects supporting it across this many parallel test processes")
+    parser.add_argument("--timeout-factor", type=float, default=3.0,
+                        help="With --baseline, lint and test commands are killed after this multiple of their baseline duration plus --timeout-slack")
+    parser.add_argument("--timeout-slack", type=float, default=30.0,
+                        help="Seconds added to the scaled baseline duration. Without --baseline commands are killed after "
+                             + str(DEFAULT_COMMAND_TIMEOUT) + "s")
 
     return parser.parse_args()
 
@@ -236,12 +548,31 @@ def get_class(folder, className):
 
 if __name__ == "__main__":
     args = read_args()
+    set_mmap_enabled(args.mmap_file_cache)
 
     projectClass = get_class(args.project_folder, args.project)
     promptStrategyClass = get_class('prompt_strategies', args.prompt_strategy)
 
     main(project=projectClass(), 
          prompt_strategy=promptStrategyClass(), 
+         verification_strategy=ChoiEtAlVerification(concurrent=args.concurrent_verification),
          model=args.model,
          base_log_dir=args.base_log_dir,
-         iterations=args.iterations)
\ No newline at end of file
+         iterations=args.iterations,
+         lizard_workers=args.lizard_workers,
+         cache_dir=args.cache_dir,
+         workers=args.workers,
+         prefetch=args.prefetch,
+         test_impact=args.test_impact,
+         baseline=args.baseline,
+         eslint_server=args.eslint_server,
+         confirm_full_lint=args.confirm_full_lint,
+         test_daemon=args.test_daemon,
+         max_test_failures=args.max_test_failures,
+         timeout_factor=args.timeout_factor,
+         timeout_slack=args.timeout_slack,
+         test_shards=args.test_shards,
+         verification_cache=args.verification_cache,
+         llm_cache=args.llm_cache,
+         max_concurrent_requests=args.max_concurrent_requests,
+         confirm_full_suite=args.confirm_full_suite)
\ No newline at end of file
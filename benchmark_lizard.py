@@ -0,0 +1,52 @@
+import argparse
+import importlib.util
+import os
+import time
+from helpers.LizardHelper import compute_cyclomatic_complexity
+
+
+def load_project(folder: str, class_name: str):
+    path = os.path.join(folder, f"{class_name}.py")
+    spec = importlib.util.spec_from_file_location(class_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)()
+
+
+def time_analysis(path: str, workers: int, repetitions: int) -> tuple[float, int]:
+    durations = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        functions = compute_cyclomatic_complexity(path, workers)
+        durations.append(time.perf_counter() - start)
+    return min(durations), len(functions)
+
+
+def benchmark(project_folder: str, workers: int, repetitions: int) -> None:
+    print(f"{'project':<20}{'functions':>10}{'1 worker (s)':>15}{str(workers) + ' workers (s)':>16}{'speedup':>10}")
+    for file_name in sorted(os.listdir(project_folder)):
+        if not file_name.endswith('.py'):
+            continue
+        project = load_project(project_folder, file_name[:-3])
+        code_path = project.path + project.code_dir
+        if not os.path.exists(code_path):
+            print(f"{project.name:<20}skipped, {code_path} not found (run clone_repos.sh)")
+            continue
+
+        sequential, function_count = time_analysis(code_path, 1, repetitions)
+        parallel, parallel_function_count = time_analysis(code_path, workers, repetitions)
+        if parallel_function_count != function_count:
+            print(f"{project.name:<20}results differ: {function_count} vs {parallel_function_count} functions")
+            continue
+
+        print(f"{project.name:<20}{function_count:>10}{sequential:>15.2f}{parallel:>16.2f}{sequential / parallel:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare single and multi-process lizard analysis on the bundled projects.")
+    parser.add_argument("--project-folder", type=str, default="projects")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repetitions", type=int, default=3)
+
+    args = parser.parse_args()
+    benchmark(args.project_folder, args.workers, args.repetitions)
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from collections import Counter
+from interfaces.LintError import LintError
+from interfaces.TestError import TestError
+from interfaces.ProjectInterface import ProjectInterface
+from helpers.CandidateSnapshot import CandidateSnapshot
+from util.Logger import get_logger
+
+BASELINE_FORMAT_VERSION = 1
+
+
+def __relative_to__(file: str | None, path: str) -> str | None:
+    """Paths of errors relative to the workspace they come from, so results of different workspaces compare"""
+    if file is None:
+        return None
+    if file.startswith('file://'):
+        file = file[7:]
+    absolute_path = os.path.abspath(path)
+    absolute_file = os.path.abspath(os.path.join(absolute_path, file))
+    if absolute_file.startswith(absolute_path + os.sep):
+        return os.path.relpath(absolute_file, absolute_path)
+    return file
+
+
+def __get_lint_key__(error: LintError, path: str) -> tuple:
+    # without the line, which moves when code above it changes
+    return (__relative_to__(error['file'], path), error['rule_id'], error['message'])
+
+
+def __get_test_key__(error: TestError, path: str) -> tuple:
+    # without the message, which can differ between runs of a flaky test
+    return (error['expectation'], __relative_to__(error['test_file'], path))
+
+
+def __subtract__(errors: list, keys: list[tuple], baseline_keys: Counter) -> list:
+    remaining = baseline_keys.copy()
+    new_errors = []
+    for error, key in zip(errors, keys):
+        if remaining[key] > 0:
+            remaining[key] -= 1
+        else:
+            new_errors.append(error)
+    return new_errors
+
+
+class Baseline:
+    """Lint errors and failing tests of the untouched project, with the time it takes to lint and test it.
+    Errors already present in the baseline are not blamed on a refactoring."""
+
+    def __init__(self, data: dict):
+        self.commit: str = data['commit']
+        self.lint_duration: float = data['lint']['duration']
+        self.test_duration: float = data['test']['duration']
+        self.__lint_keys = Counter(tuple(key) for key in data['lint']['errors'])
+        self.__test_keys = Counter(tuple(key) for key in data['test']['errors'])
+
+    @property
+    def lint_error_count(self) -> int:
+        return sum(self.__lint_keys.values())
+
+    @property
+    def test_error_count(self) -> int:
+        return sum(self.__test_keys.values())
+
+    def new_lint_errors(self, errors: list[LintError], path: str) -> list[LintError]:
+        """The errors which are not part of the baseline, path is the workspace the errors come from"""
+        return __subtract__(errors, [__get_lint_key__(error, path) for error in errors], self.__lint_keys)
+
+    def new_test_errors(self, errors: list[TestError], path: str) -> list[TestError]:
+        """The failing tests which are not part of the baseline, path is the workspace the errors come from"""
+        return __subtract__(errors, [__get_test_key__(error, path) for error in errors], self.__test_keys)
+
+
+def __build_baseline_data(project: ProjectInterface, snapshot: CandidateSnapshot) -> dict:
+    path = project.dirty_path
+
+    start = time.perf_counter()
+    lint_errors = project.get_lint_errors()
+    lint_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    test_errors = project.get_test_errors()
+    test_duration = time.perf_counter() - start
+
+    return {
+        'version': BASELINE_FORMAT_VERSION,
+        'commit': snapshot.commit,
+        'source_digest': snapshot.source_digest,
+        'lint': {
+            'duration': lint_duration,
+            'errors': [__get_lint_key__(error, path) for error in lint_errors]
+        },
+        'test': {
+            'duration': test_duration,
+            'errors': [__get_test_key__(error, path) for error in test_errors]
+        }
+    }
+
+
+def load_baseline(project: ProjectInterface, snapshot: CandidateSnapshot, cache_dir: str) -> Baseline:
+    """Lints and tests the untouched dirty workspace once per commit of the project and stores the results.
+    Has to be called before any change is made to the dirty workspace."""
+    baseline_dir = os.path.join(cache_dir, 'baselines')
+    baseline_path = os.path.join(baseline_dir, project.name + '-' + snapshot.commit[:12] + '-'
+                                 + snapshot.source_digest[:16] + '.json')
+
+    if os.path.exists(baseline_path):
+        with open(baseline_path, 'r', encoding='utf-8') as baseline_file:
+            data = json.load(baseline_file)
+        if data.get('version') == BASELINE_FORMAT_VERSION and data['source_digest'] == snapshot.source_digest:
+            baseline = Baseline(data)
+            get_logger().info("Loaded baseline " + baseline_path)
+            return baseline
+
+    data = __build_baseline_data(project, snapshot)
+
+    os.makedirs(baseline_dir, exist_ok=True)
+    temp_path = baseline_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as baseline_file:
+        json.dump(data, baseline_file)
+    os.replace(temp_path, baseline_path)
+
+    baseline = Baseline(data)
+    get_logger().info("Saved baseline {}: {} lint error(s) in {:.1f}s, {} failing test(s) in {:.1f}s".format(
+        baseline_path, baseline.lint_error_count, baseline.lint_duration,
+        baseline.test_error_count, baseline.test_duration))
+    return baseline
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+from typing import Iterator
+import lizard  # type: ignore
+from interfaces.LizardResult import LizardResult
+from interfaces.ProjectInterface import ProjectInterface
+from helpers.GitHelper import get_head_commit
+from helpers.LizardHelper import (
+    compute_cyclomatic_complexity, get_functions_sorted_by_complexity,
+    compute_avg_cc, extract_function_code, get_source_files
+)
+from util.Logger import get_logger
+
+SNAPSHOT_FORMAT_VERSION = 3
+
+
+def __compute_source_digest__(path: str, files: list[str]) -> str:
+    digest = hashlib.sha1()
+    digest.update(lizard.version.encode())
+    for file in sorted(files):
+        with open(file, 'rb') as source_file:
+            content_hash = hashlib.sha1(source_file.read()).hexdigest()
+        digest.update(os.path.relpath(file, path).encode())
+        digest.update(content_hash.encode())
+    return digest.hexdigest()
+
+
+def __to_lizard_result__(entry: dict, root_path: str) -> LizardResult:
+    return LizardResult(root_path + '/' + entry['file'], entry['name'], entry['long_name'],
+                        entry['start_line'], entry['end_line'], entry['cyclomatic_complexity'], entry['nloc'])
+
+
+class CandidateSnapshot:
+    """Refactoring candidates and the baseline metrics of a project at a given commit.
+    Stored on disk under a key derived from the commit and the content of the source files,
+    so runs on the same pinned commit share it and any change to the source invalidates it.
+    The code of a candidate is read from the original file when it is needed, the digest guarantees it is unchanged."""
+
+    def __init__(self, project: ProjectInterface, data: dict):
+        self.project = project
+        self.commit: str = data['commit']
+        self.source_digest: str = data['source_digest']
+        self.baseline_avg_cc: float = data['baseline']['avg_cc']
+        self.baseline_fn_count: int = data['baseline']['fn_count']
+        self.baseline_avg_nloc: float = data['baseline']['avg_nloc']
+        self.__functions: list[LizardResult] = [__to_lizard_result__(entry, project.path)
+                                                 for entry in data['functions']]
+
+    def candidates(self) -> Iterator[LizardResult]:
+        """Functions of the original project, most complex first"""
+        return get_functions_sorted_by_complexity(self.__functions)
+
+    def functions_in(self, root_path: str) -> list[LizardResult]:
+        """Functions of a copy of the project (e. g. the target), as if it had been analyzed"""
+        prefix_length = len(self.project.path)
+        return [LizardResult(root_path + function.filename[prefix_length:], function.name, function.long_name,
+                             function.start_line, function.end_line, function.cyclomatic_complexity, function.nloc)
+                for function in self.__functions]
+
+    def get_code(self, lizard_result: LizardResult) -> str:
+        """Code of a candidate of the original project"""
+        return extract_function_code(lizard_result)
+
+
+def __build_snapshot_data(project: ProjectInterface, commit: str, source_digest: str, workers: int) -> dict:
+    functions = compute_cyclomatic_complexity(project.path + project.code_dir, workers)
+    entries = []
+    for function in functions:
+        entries.append({
+            'file': function.filename.replace(project.path + '/', ''),
+            'name': function.name,
+            'long_name': function.long_name,
+            'start_line': function.start_line,
+            'end_line': function.end_line,
+            'cyclomatic_complexity': function.cyclomatic_complexity,
+            'nloc': function.nloc
+        })
+
+    return {
+        'version': SNAPSHOT_FORMAT_VERSION,
+        'commit': commit,
+        'source_digest': source_digest,
+        'baseline': {
+            'avg_cc': compute_avg_cc(functions),
+            'fn_count': len(functions),
+            'avg_nloc': sum(fun.nloc for fun in functions) / len(functions)
+        },
+        'functions': entries
+    }
+
+
+def load_candidate_snapshot(project: ProjectInterface, cache_dir: str, workers: int = 1) -> CandidateSnapshot:
+    code_path = project.path + project.code_dir
+    commit = get_head_commit(project.path)
+    source_digest = __compute_source_digest__(code_path, get_source_files(code_path))
+
+    snapshot_dir = os.path.join(cache_dir, 'snapshots')
+    snapshot_path = os.path.join(snapshot_dir, project.name + '-' + commit[:12] + '-' + source_digest[:16] + '.json')
+
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r', encoding='utf-8') as snapshot_file:
+            data = json.load(snapshot_file)
+        if data.get('version') == SNAPSHOT_FORMAT_VERSION and data['source_digest'] == source_digest:
+            get_logger().info("Loaded candidate snapshot " + snapshot_path)
+            return CandidateSnapshot(project, data)
+
+    data = __build_snapshot_data(project, commit, source_digest, workers)
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    temp_path = snapshot_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as snapshot_file:
+        json.dump(data, snapshot_file)
+    os.replace(temp_path, snapshot_path)
+    get_logger().info("Saved candidate snapshot " + snapshot_path)
+
+    return CandidateSnapshot(project, data)
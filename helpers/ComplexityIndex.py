@@ -0,0 +1,71 @@
+import hashlib
+from interfaces.LizardResult import LizardResult
+from helpers.LizardHelper import compute_cyclomatic_complexity, analyze_file
+
+
+def __hash_file__(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+class ComplexityIndex:
+    """Per-file index of lizard results with running totals of the project metrics.
+    After a patch only the touched file is analyzed again and the totals are updated from the deltas."""
+
+    def __init__(self, path: str, workers: int = 1, functions: list[LizardResult] | None = None):
+        self.path = path
+        self.__entries: dict[str, tuple[str, list[LizardResult]]] = {}
+        self.__fn_count = 0
+        self.__cc_sum = 0
+        self.__nloc_sum = 0
+
+        functions_by_file: dict[str, list[LizardResult]] = {}
+        if functions is None:
+            functions = compute_cyclomatic_complexity(path, workers)
+
+        for function in functions:
+            functions_by_file.setdefault(function.filename, []).append(function)
+
+        for filename, functions in functions_by_file.items():
+            self.__add_entry(filename, __hash_file__(filename), functions)
+
+    def __add_entry(self, filename: str, content_hash: str, functions: list[LizardResult]) -> None:
+        self.__entries[filename] = (content_hash, functions)
+        self.__fn_count += len(functions)
+        self.__cc_sum += sum(fun.cyclomatic_complexity for fun in functions)
+        self.__nloc_sum += sum(fun.nloc for fun in functions)
+
+    def __remove_entry(self, filename: str) -> None:
+        _, functions = self.__entries.pop(filename)
+        self.__fn_count -= len(functions)
+        self.__cc_sum -= sum(fun.cyclomatic_complexity for fun in functions)
+        self.__nloc_sum -= sum(fun.nloc for fun in functions)
+
+    def update_file(self, filename: str) -> bool:
+        """Analyzes the given file again if its content changed. Returns whether the index was updated."""
+        content_hash = __hash_file__(filename)
+        if filename in self.__entries:
+            if self.__entries[filename][0] == content_hash:
+                return False
+            self.__remove_entry(filename)
+
+        functions = analyze_file(filename)
+        if len(functions) > 0:
+            self.__add_entry(filename, content_hash, functions)
+        return True
+
+    @property
+    def functions(self) -> list[LizardResult]:
+        return [function for _, functions in self.__entries.values() for function in functions]
+
+    @property
+    def fn_count(self) -> int:
+        return self.__fn_count
+
+    @property
+    def avg_cc(self) -> float:
+        return self.__cc_sum / self.__fn_count
+
+    @property
+    def avg_nloc(self) -> float:
+        return self.__nloc_sum / self.__fn_count
@@ -0,0 +1,174 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+from interfaces.ProjectInterface import ProjectInterface
+from helpers.GitHelper import get_head_commit
+from helpers.LizardHelper import get_source_files
+from helpers.StreamingProcess import run_in_process_group, CommandTimeoutError
+from util.Logger import get_logger
+
+COVERAGE_FORMAT_VERSION = 1
+
+# (globs, copy of the project) -> test files, the refactoring never adds or removes them
+_test_files: dict[tuple[str, str | None, str], list[str]] = {}
+
+
+def get_test_files(project: ProjectInterface, path: str) -> list[str]:
+    """Test files matching the glob of the project, relative to the given copy of the project.
+    The glob runs once per copy, later calls get the same files."""
+    key = (project.test_files_glob, project.test_support_files_glob, os.path.abspath(path))
+    if key not in _test_files:
+        _test_files[key] = __find_test_files__(project, path)
+    return list(_test_files[key])
+
+
+def __find_test_files__(project: ProjectInterface, path: str) -> list[str]:
+    support_files: set[str] = set()
+    if project.test_support_files_glob is not None:
+        support_files = {os.path.relpath(file, path)
+                         for file in glob.glob(os.path.join(path, project.test_support_files_glob), recursive=True)}
+
+    test_files = []
+    for file in glob.glob(os.path.join(path, project.test_files_glob), recursive=True):
+        relative_file = os.path.relpath(file, path)
+        if 'node_modules' in relative_file.split(os.sep) or relative_file in support_files:
+            continue
+        test_files.append(relative_file)
+    return sorted(test_files)
+
+
+def __compute_digest__(path: str, files: list[str]) -> str:
+    digest = hashlib.sha1()
+    for file in sorted(files):
+        with open(os.path.join(path, file), 'rb') as content:
+            digest.update(file.encode())
+            digest.update(hashlib.sha1(content.read()).hexdigest().encode())
+    return digest.hexdigest()
+
+
+def __to_line_ranges__(lines: list[int]) -> list[list[int]]:
+    ranges: list[list[int]] = []
+    for line in sorted(set(lines)):
+        if len(ranges) > 0 and ranges[-1][1] + 1 >= line:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ranges
+
+
+def __read_covered_lines__(report_path: str, path: str, code_path: str) -> dict[str, list[list[int]]]:
+    """Covered lines per source file from an istanbul json report (coverage-final.json)"""
+    with open(report_path, 'r', encoding='utf-8') as report_file:
+        report = json.load(report_file)
+
+    covered_lines: dict[str, list[list[int]]] = {}
+    for file, file_coverage in report.items():
+        absolute_file = os.path.abspath(file)
+        if not absolute_file.startswith(code_path):
+            continue
+
+        lines = []
+        for statement_id, count in file_coverage['s'].items():
+            if count == 0:
+                continue
+            location = file_coverage['statementMap'][statement_id]
+            lines.extend(range(location['start']['line'], location['end']['line'] + 1))
+
+        if len(lines) > 0:
+            covered_lines[os.path.relpath(absolute_file, path)] = __to_line_ranges__(lines)
+    return covered_lines
+
+
+def __collect_coverage__(project: ProjectInterface, path: str, test_files: list[str]) -> dict:
+    """Runs every test file on its own under c8 and maps source files to the lines each test file covers"""
+    code_path = os.path.abspath(path + project.code_dir)
+    report_dir = os.path.join(os.path.abspath(path), '.test-impact-coverage')
+    coverage: dict[str, dict[str, list[list[int]]]] = {}
+
+    for idx, test_file in enumerate(test_files, start=1):
+        shutil.rmtree(report_dir, ignore_errors=True)
+        test_command = project.get_test_command([test_file])
+        command = ('npx --yes c8 --reporter=json --report-dir=' + report_dir
+                   + ' --temp-directory=' + os.path.join(report_dir, 'tmp') + ' ' + test_command)
+        try:
+            run_in_process_group(command, path, timeout=300)
+        except CommandTimeoutError:
+            get_logger().info("Collecting coverage of " + test_file + " timed out")
+            continue
+
+        report_path = os.path.join(report_dir, 'coverage-final.json')
+        if not os.path.exists(report_path):
+            get_logger().info("No coverage report for " + test_file)
+            continue
+
+        for source_file, ranges in __read_covered_lines__(report_path, os.path.abspath(path), code_path).items():
+            coverage.setdefault(source_file, {})[test_file] = ranges
+        get_logger().info("Collected coverage of test file {}/{}: {}".format(idx, len(test_files), test_file))
+
+    shutil.rmtree(report_dir, ignore_errors=True)
+    return coverage
+
+
+class TestImpactMap:
+    """Maps line ranges of the source files to the test files covering them,
+    so only the tests affected by a change to a function need to run."""
+
+    def __init__(self, coverage: dict[str, dict[str, list[list[int]]]]):
+        self.__coverage = coverage
+
+    def get_covering_tests(self, relative_path: str, start_line: int, end_line: int) -> list[str] | None:
+        """Test files covering any line of the range. Falls back to the test files covering the file
+        when the function itself is never executed (e. g. only its declaration is) and
+        returns None if no test touches the file, then the full suite has to run."""
+        tests_by_file = self.__coverage.get(relative_path)
+        if tests_by_file is None:
+            return None
+
+        covering_tests = [test_file for test_file, ranges in tests_by_file.items()
+                          if any(start <= end_line and end >= start_line for start, end in ranges)]
+        if len(covering_tests) == 0:
+            covering_tests = list(tests_by_file.keys())
+        return sorted(covering_tests)
+
+
+def load_test_impact_map(project: ProjectInterface, path: str, cache_dir: str) -> TestImpactMap | None:
+    """Builds the test impact map from a baseline run of the tests in the given copy of the project,
+    reusing the one stored in the cache when neither the source nor the test files changed.
+    Returns None for projects that cannot run a subset of their tests."""
+    if project.test_files_glob is None:
+        get_logger().info("Test impact selection not supported by " + project.name + ", running the full suite")
+        return None
+
+    code_path = path + project.code_dir
+    test_files = get_test_files(project, path)
+    source_files = [os.path.relpath(file, path) for file in get_source_files(code_path)]
+    digest = __compute_digest__(path, source_files + test_files)
+    commit = get_head_commit(project.path)
+
+    coverage_dir = os.path.join(cache_dir, 'coverage')
+    coverage_path = os.path.join(coverage_dir, project.name + '-' + commit[:12] + '-' + digest[:16] + '.json')
+
+    if os.path.exists(coverage_path):
+        with open(coverage_path, 'r', encoding='utf-8') as coverage_file:
+            data = json.load(coverage_file)
+        if data.get('version') == COVERAGE_FORMAT_VERSION and data['digest'] == digest:
+            get_logger().info("Loaded test impact map " + coverage_path)
+            return TestImpactMap(data['coverage'])
+
+    get_logger().info("Collecting coverage of {} test files".format(len(test_files)))
+    data = {
+        'version': COVERAGE_FORMAT_VERSION,
+        'digest': digest,
+        'coverage': __collect_coverage__(project, path, test_files)
+    }
+
+    os.makedirs(coverage_dir, exist_ok=True)
+    temp_path = coverage_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as coverage_file:
+        json.dump(data, coverage_file)
+    os.replace(temp_path, coverage_path)
+    get_logger().info("Saved test impact map " + coverage_path)
+
+    return TestImpactMap(data['coverage'])
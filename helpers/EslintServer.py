@@ -0,0 +1,31 @@
+import json
+import shlex
+from helpers.NodeServer import NodeServer, get_node_server
+from util.Logger import get_logger
+
+SERVER_SCRIPT_NAME = 'eslint-server.js'
+
+
+def get_server_options(lint_command: str) -> dict:
+    """ESLint API options equivalent to the options of a lint command (file patterns are ignored)"""
+    options = {}
+    arguments = shlex.split(lint_command)
+    for idx, argument in enumerate(arguments[:-1]):
+        if argument in ('-c', '--config'):
+            options['overrideConfigFile'] = arguments[idx + 1]
+        elif argument == '--resolve-plugins-relative-to':
+            options['resolvePluginsRelativeTo'] = arguments[idx + 1]
+    return options
+
+
+def lint_files_with_server(workspace_path: str, lint_command: str, files: list[str],
+                           timeout: float = 120) -> list[dict]:
+    """Lints the files (relative to the workspace) in an ESLint instance kept alive per workspace,
+    so linting does not pay for starting Node and loading ESLint, its config and plugins.
+    Returns the results of the ESLint json formatter, raises NodeServerError if the server fails."""
+    def create() -> NodeServer:
+        get_logger().info("Starting ESLint server in " + workspace_path)
+        return NodeServer(SERVER_SCRIPT_NAME, workspace_path, [json.dumps(get_server_options(lint_command))])
+
+    server = get_node_server((SERVER_SCRIPT_NAME, workspace_path), create)
+    return server.request({'files': files}, timeout)['results']
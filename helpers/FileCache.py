@@ -0,0 +1,65 @@
+import mmap
+import os
+
+_cached_files: dict[str, 'CachedFile'] = {}
+_use_mmap = False
+
+
+class CachedFile:
+    """Content of a source file together with the offsets at which its lines start,
+    so any range of lines can be sliced without scanning or joining the lines before it."""
+
+    def __init__(self, path: str, use_mmap: bool = False):
+        self.path = path
+        with open(path, 'rb') as file:
+            if use_mmap and os.path.getsize(path) > 0:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = file.read()
+
+        self.line_offsets = [0]
+        newline = self.data.find(b'\n')
+        while newline != -1:
+            self.line_offsets.append(newline + 1)
+            newline = self.data.find(b'\n', newline + 1)
+        if self.line_offsets[-1] != len(self.data):
+            self.line_offsets.append(len(self.data))
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets) - 1
+
+    def get_byte_range(self, start_line: int, end_line: int) -> tuple[int, int]:
+        """Returns the byte offsets at which the lines from start_line to end_line (1-based, inclusive) start and end"""
+        return self.line_offsets[max(start_line - 1, 0)], self.line_offsets[min(end_line, self.line_count)]
+
+    def get_lines(self, start_line: int, end_line: int) -> str:
+        """Returns the lines from start_line to end_line (1-based, inclusive) with their line breaks,
+        normalized to '\\n' like reading the file in text mode does."""
+        start, end = self.get_byte_range(start_line, end_line)
+        return self.data[start:end].decode('utf-8').replace('\r\n', '\n')
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+def set_mmap_enabled(enabled: bool) -> None:
+    """Maps files into memory instead of reading them. Only affects files that are not cached yet."""
+    global _use_mmap
+    _use_mmap = enabled
+
+
+def get_cached_file(path: str) -> CachedFile:
+    cached_file = _cached_files.get(path)
+    if cached_file is None:
+        cached_file = CachedFile(path, _use_mmap)
+        _cached_files[path] = cached_file
+    return cached_file
+
+
+def invalidate_cached_file(path: str) -> None:
+    """Must be called before a cached file is written, its content is read again on next access."""
+    cached_file = _cached_files.pop(path, None)
+    if cached_file is not None:
+        cached_file.close()
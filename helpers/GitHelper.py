@@ -1,8 +1,21 @@
-from git import Repo
+from git import Repo, InvalidGitRepositoryError, NoSuchPathError
 import os
-from interfaces.Function import Function
+from typing import TYPE_CHECKING
 
-def save_git_diff_patch(repo: Repo, function: Function, log_dir: str, idx: int):
+if TYPE_CHECKING:
+    # Function imports helpers using get_head_commit
+    from interfaces.Function import Function
+
+
+def get_head_commit(path: str) -> str:
+    """Commit checked out in the repository at path, 'no-commit' if it is not a git repository"""
+    try:
+        return Repo(path).head.commit.hexsha
+    except (InvalidGitRepositoryError, NoSuchPathError, ValueError):
+        return 'no-commit'
+
+
+def save_git_diff_patch(repo: Repo, function: 'Function', log_dir: str, idx: int):
     diff = repo.git.diff(function.relative_path)
 
     patch_dir = log_dir + '/patches'
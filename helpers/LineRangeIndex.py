@@ -0,0 +1,21 @@
+from bisect import bisect_right, insort
+
+
+class LineRangeIndex:
+    """Per-file index of disjoint line ranges, e. g. of functions that have already been improved.
+    Ranges are kept sorted by their start line, so overlap checks are a binary search."""
+
+    def __init__(self):
+        self.__ranges: dict[str, list[tuple[int, int]]] = {}
+
+    def add(self, filename: str, start_line: int, end_line: int) -> None:
+        insort(self.__ranges.setdefault(filename, []), (start_line, end_line))
+
+    def overlaps(self, filename: str, start_line: int, end_line: int) -> bool:
+        ranges = self.__ranges.get(filename)
+        if not ranges:
+            return False
+
+        # the last range starting at or before end_line is the only one that can reach into [start_line, end_line]
+        position = bisect_right(ranges, (end_line, float('inf'))) - 1
+        return position >= 0 and ranges[position][1] >= start_line
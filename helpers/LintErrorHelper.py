@@ -0,0 +1,21 @@
+import os
+from interfaces.LintError import LintError
+
+
+def scope_lint_errors(errors: list[LintError], file_path: str, start_line: int, end_line: int) -> list[LintError]:
+    """Errors reported for the lines from start_line to end_line (1-based, inclusive) of the file,
+    keeping one error per rule and line"""
+    file_path = os.path.abspath(file_path)
+    seen: set[tuple[str, int]] = set()
+    scoped_errors: list[LintError] = []
+    for error in errors:
+        if not start_line <= error['target_line'] <= end_line:
+            continue
+        if os.path.abspath(error['file']) != file_path:
+            continue
+        key = (error['rule_id'], error['target_line'])
+        if key in seen:
+            continue
+        seen.add(key)
+        scoped_errors.append(error)
+    return scoped_errors
@@ -1,24 +1,62 @@
 import lizard  # type: ignore
 import re
 from statistics import mean
-from functools import reduce
-import operator
+import heapq
+from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from interfaces.TestError import TestError
 from interfaces.ProjectInterface import ProjectInterface
 from interfaces.LizardResult import LizardResult
+from helpers.FileCache import get_cached_file
 
-def compute_cyclomatic_complexity(path: str) -> list[LizardResult]:
+def __analyze_file_information(path: str):
     extensions = lizard.get_extensions(extension_names=["io"])
-    analysis = lizard.analyze(paths=[path], exts=extensions)
+    file_analyzer = lizard.FileAnalyzer(extensions)
+    return file_analyzer(path)
+
+
+def __analyze_in_process_pool(path: str, workers: int) -> list:
+    extensions = lizard.get_extensions(extension_names=["io"])
+    files = get_source_files(path)
+
+    # map keeps the order of the files, so the results do not depend on which worker finishes first
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        analysis = list(pool.map(__analyze_file_information, files, chunksize=chunksize))
+
+    for extension in extensions:
+        if hasattr(extension, 'cross_file_process'):
+            analysis = list(extension.cross_file_process(analysis))
+
+    return analysis
+
+
+def compute_cyclomatic_complexity(path: str, workers: int = 1) -> list[LizardResult]:
+    if workers > 1:
+        analysis = __analyze_in_process_pool(path, workers)
+    else:
+        extensions = lizard.get_extensions(extension_names=["io"])
+        analysis = lizard.analyze(paths=[path], exts=extensions)
 
     functions = list()
-    for file in list(analysis):
+    for file in analysis:
         for function in file.function_list:
-            functions.append(function)
+            functions.append(LizardResult.from_function_info(function))
 
     return functions
 
 
+def get_source_files(path: str) -> list[str]:
+    """Lists the files lizard analyzes for the given path, in the order of the analysis"""
+    return list(lizard.get_all_source_files([path], [], None))
+
+
+def analyze_file(path: str) -> list[LizardResult]:
+    analysis = __analyze_file_information(path)
+
+    return [LizardResult.from_function_info(function) for function in analysis.function_list]
+
+
 def compute_avg_cc(functions: list[LizardResult]) -> float:
     complexities: list[int] = []
     for fun in functions:
@@ -29,10 +67,15 @@ def compute_avg_cc(functions: list[LizardResult]) -> float:
     return avg_cc
 
 
-def get_functions_sorted_by_complexity(functions: list[LizardResult]) -> list[LizardResult]:
-    result = sorted(
-        functions, key=lambda fun: fun.cyclomatic_complexity, reverse=True)
-    return result
+def get_functions_sorted_by_complexity(functions: list[LizardResult]) -> Iterator[LizardResult]:
+    """Lazily yields the functions from the most to the least complex one.
+    Building the heap is linear, so taking the first k functions costs O(n + k log n) instead of a full sort.
+    Functions with the same complexity keep their original order."""
+    heap = [(-fun.cyclomatic_complexity, position) for position, fun in enumerate(functions)]
+    heapq.heapify(heap)
+    while heap:
+        _, position = heapq.heappop(heap)
+        yield functions[position]
 
 def add_function_keyword(code):
     # This regex matches method definitions inside classes
@@ -67,10 +110,7 @@ def compute_cc_from_code(code: str) -> int:
     return highest_complexity
 
 def extract_function_code(function: LizardResult) -> str:
-    with open(function.filename) as file:
-        code = file.readlines()
-    function_lines = code[function.start_line - 1:function.end_line]
-    function_code = reduce(operator.add, function_lines)
+    function_code = get_cached_file(function.filename).get_lines(function.start_line, function.end_line)
     # code_without_leading_spaces = function_code.lstrip()
     # return code_without_leading_spaces
     return function_code
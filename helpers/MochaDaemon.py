@@ -0,0 +1,53 @@
+import os
+import shlex
+import threading
+from helpers.NodeServer import NodeServer, NodeServerError, get_node_server
+from util.Logger import get_logger
+
+DAEMON_SCRIPT_NAME = 'mocha-daemon.js'
+
+# keys of the daemons running a suite right now
+_busy_daemons: set[tuple] = set()
+_busy_daemons_lock = threading.Lock()
+
+
+def parse_mocha_command(test_command: str) -> tuple[dict[str, str], list[str]]:
+    """Environment variables and mocha arguments of a test command like 'npx cross-env A=b mocha --exit'"""
+    arguments = shlex.split(test_command)
+    env: dict[str, str] = {}
+    while len(arguments) > 0 and (arguments[0] in ('npx', 'cross-env') or '=' in arguments[0]):
+        argument = arguments.pop(0)
+        if '=' in argument:
+            name, value = argument.split('=', 1)
+            env[name] = value
+
+    if len(arguments) == 0 or os.path.basename(arguments[0]) not in ('mocha', '_mocha'):
+        raise NodeServerError("Not a mocha command: " + test_command)
+    return env, arguments[1:]
+
+
+def run_mocha_in_daemon(workspace_path: str, test_command: str, timeout: float = 120) -> list[dict]:
+    """Runs the mocha suite in a process kept warm per workspace, which only loads the modules changed since
+    the previous run again. Returns the failures like the mocha json reporter does,
+    raises NodeServerError if the daemon cannot run the suite."""
+    env, arguments = parse_mocha_command(test_command)
+
+    def create() -> NodeServer:
+        get_logger().info("Starting mocha daemon in " + workspace_path)
+        return NodeServer(DAEMON_SCRIPT_NAME, workspace_path, arguments, env={**os.environ, **env}, timeout=timeout)
+
+    # the test files are sent with each run, so runs of different files share the daemons of a workspace;
+    # runs at the same time (e. g. shards) each get their own one
+    with _busy_daemons_lock:
+        slot = 0
+        while (DAEMON_SCRIPT_NAME, workspace_path, str(env), slot) in _busy_daemons:
+            slot += 1
+        key = (DAEMON_SCRIPT_NAME, workspace_path, str(env), slot)
+        _busy_daemons.add(key)
+
+    try:
+        server = get_node_server(key, create)
+        return server.request({'arguments': arguments}, timeout)['failures']
+    finally:
+        with _busy_daemons_lock:
+            _busy_daemons.discard(key)
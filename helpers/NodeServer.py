@@ -0,0 +1,111 @@
+import atexit
+import json
+import os
+import subprocess
+import threading
+from queue import Queue, Empty
+from helpers.StreamingProcess import kill_process_group
+
+NODE_SCRIPTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'node')
+
+
+class NodeServerError(Exception):
+    pass
+
+
+class NodeServerTimeout(NodeServerError):
+    pass
+
+
+class NodeServer:
+    """Long-running Node process started in a workspace, answering requests sent as one JSON object per line
+    on stdin with one JSON object per line on stdout. The first line it writes tells whether it is ready."""
+
+    def __init__(self, script_name: str, workspace_path: str, arguments: list[str],
+                 env: dict[str, str] | None = None, timeout: float = 120):
+        self.workspace_path = workspace_path
+        self.__lock = threading.Lock()
+        self.__next_id = 0
+        self.__process = subprocess.Popen(['node', os.path.join(NODE_SCRIPTS_PATH, script_name)] + arguments,
+                                          cwd=workspace_path, env=env, stdin=subprocess.PIPE,
+                                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1,
+                                          start_new_session=True)
+        self.__responses: Queue[str] = Queue()
+        threading.Thread(target=self.__read_stdout, daemon=True).start()
+
+        ready = self.__read_response(timeout)
+        if 'error' in ready:
+            self.close()
+            raise NodeServerError(ready['error'])
+
+    def __read_stdout(self) -> None:
+        for line in self.__process.stdout:
+            self.__responses.put(line)
+        self.__responses.put('')
+
+    def __read_response(self, timeout: float) -> dict:
+        try:
+            line = self.__responses.get(timeout=timeout)
+        except Empty:
+            self.kill()
+            raise NodeServerTimeout("No response from " + self.workspace_path + " within " + str(timeout) + "s")
+        if line == '':
+            raise NodeServerError("Node process in " + self.workspace_path + " exited")
+        return json.loads(line)
+
+    def request(self, request: dict, timeout: float = 120) -> dict:
+        """Sends the request and waits for its response, raises NodeServerError if it failed.
+        A server not answering within the timeout is killed."""
+        with self.__lock:
+            self.__next_id += 1
+            try:
+                self.__process.stdin.write(json.dumps({'id': self.__next_id, **request}) + '\n')
+                self.__process.stdin.flush()
+            except OSError as e:
+                raise NodeServerError("Node process in " + self.workspace_path + " exited") from e
+
+            response = self.__read_response(timeout)
+            if 'error' in response:
+                raise NodeServerError(response['error'])
+            return response
+
+    @property
+    def is_alive(self) -> bool:
+        return self.__process.poll() is None
+
+    def kill(self) -> None:
+        """Kills the server and the processes it started, e. g. servers left running by tests"""
+        kill_process_group(self.__process)
+
+    def close(self) -> None:
+        if self.__process.poll() is None:
+            self.__process.stdin.close()
+            try:
+                self.__process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                kill_process_group(self.__process)
+
+
+_servers: dict[tuple[str, ...], NodeServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_node_server(key: tuple[str, ...], create) -> NodeServer:
+    """The server for the key (e. g. script and workspace), created by calling create() on first use
+    or when the previous one exited"""
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None or not server.is_alive:
+            server = create()
+            _servers[key] = server
+        return server
+
+
+def close_node_servers() -> None:
+    with _servers_lock:
+        for server in _servers.values():
+            server.close()
+        _servers.clear()
+
+
+atexit.register(close_node_servers)
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+from helpers.FileCache import invalidate_cached_file
+
+# path -> {(original start, original end): current length in bytes}
+_patched_ranges: dict[str, dict[tuple[int, int], int]] = {}
+
+
+def get_patched_paths(root_path: str) -> list[str]:
+    """Files below root_path patched so far, some may hold their original code again"""
+    prefix = root_path.rstrip('/') + '/'
+    return [path for path in list(_patched_ranges) if path.startswith(prefix)]
+
+
+def get_current_range(path: str, original_range: tuple[int, int]) -> tuple[int, int]:
+    """Maps the byte range a function had in the original file to its range in the patched file,
+    shifting it by the growth or shrinkage of the ranges patched before it."""
+    original_start, original_end = original_range
+    patched_ranges = _patched_ranges.get(path, {})
+
+    shift = 0
+    for (start, end), length in patched_ranges.items():
+        if end <= original_start:
+            shift += length - (end - start)
+
+    length = patched_ranges.get(original_range, original_end - original_start)
+    return original_start + shift, original_start + shift + length
+
+
+def __write_atomically(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path) or '.'
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as temp_file:
+            temp_file.write(data)
+        shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def patch_range(path: str, original_range: tuple[int, int], old_code: str, new_code: str) -> None:
+    """Replaces the code of the function that occupied original_range in the unpatched file.
+    Only that range is spliced, the file is replaced atomically through a temporary file."""
+    start, end = get_current_range(path, original_range)
+
+    with open(path, 'rb') as file:
+        filedata = file.read()
+
+    current_code = filedata[start:end].decode('utf-8').replace('\r\n', '\n')
+    if current_code != old_code:
+        raise Exception("Could not find in file " +
+                        path + " old code: " + old_code)
+
+    new_bytes = new_code.encode('utf-8')
+
+    invalidate_cached_file(path)
+    __write_atomically(path, filedata[:start] + new_bytes + filedata[end:])
+
+    _patched_ranges.setdefault(path, {})[original_range] = len(new_bytes)
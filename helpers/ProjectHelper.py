@@ -1,26 +1,153 @@
+import hashlib
 import json
 import re
 import os
 import shutil
 import subprocess
 from pathlib import Path
+from typing import Iterable, Iterator
 from interfaces.LintError import LintError
 from interfaces.TestError import TestError
 from tap import parser #type: ignore
+from helpers.WorkspaceHelper import remove_in_background
+from helpers.EslintServer import lint_files_with_server
+from helpers.MochaDaemon import run_mocha_in_daemon
+from helpers.NodeServer import NodeServerError, NodeServerTimeout, NODE_SCRIPTS_PATH
+from helpers.StreamingProcess import run_streaming, run_in_process_group, CommandTimeoutError, StreamedRun
+from util.Logger import get_logger
+
+
+DEFAULT_COMMAND_TIMEOUT = 120
+
+_node_modules_cache_dir: str | None = None
+_eslint_server_enabled = False
+_test_daemon_enabled = False
+# workspaces in which the mocha daemon failed, their tests run through the test command
+_failed_test_daemon_paths: set[str] = set()
+_max_test_failures: int | None = None
+_lint_timeout: float = DEFAULT_COMMAND_TIMEOUT
+_test_timeout: float = DEFAULT_COMMAND_TIMEOUT
+
+LOCKFILES = ['package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml']
+
+JEST_STREAM_REPORTER_PATH = os.path.join(NODE_SCRIPTS_PATH, 'jest-stream-reporter.js')
+
+
+def set_node_modules_cache_dir(cache_dir: str | None) -> None:
+    """Enables caching installed node_modules folders in the given directory, None disables it."""
+    global _node_modules_cache_dir
+    _node_modules_cache_dir = cache_dir
+
+
+def set_eslint_server_enabled(enabled: bool) -> None:
+    """Lint single files through a long-running ESLint server per workspace instead of running the lint command"""
+    global _eslint_server_enabled
+    _eslint_server_enabled = enabled
+
+
+def set_test_daemon_enabled(enabled: bool) -> None:
+    """Run mocha suites in a test runner process kept warm per workspace instead of running the test command"""
+    global _test_daemon_enabled
+    _test_daemon_enabled = enabled
+
+
+def set_max_test_failures(max_failures: int | None) -> None:
+    """Stops test runs once this many failures were read from their output, None runs them to the end"""
+    global _max_test_failures
+    _max_test_failures = max_failures
+
+
+def set_command_timeouts(lint_timeout: float, test_timeout: float) -> None:
+    """Seconds after which lint and test commands are killed, see Script for how they follow from the baseline"""
+    global _lint_timeout, _test_timeout
+    _lint_timeout = lint_timeout
+    _test_timeout = test_timeout
+
+
+def __get_node_version() -> str:
+    proc = subprocess.run(['node', '--version'], capture_output=True, text=True, check=False)
+    return proc.stdout.strip()
+
+
+def __get_node_modules_cache_key(project_path: Path, package_manager_command: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(package_manager_command.encode())
+    digest.update(__get_node_version().encode())
+    for file_name in ['package.json'] + LOCKFILES:
+        file_path = project_path / file_name
+        if file_path.exists():
+            digest.update(file_name.encode())
+            digest.update(file_path.read_bytes())
+    return digest.hexdigest()
+
+
+def __has_install_scripts(project_path: Path) -> bool:
+    """Whether npm's lockfile lists packages with preinstall, install or postinstall scripts. They build files
+    inside node_modules depending on the machine, and copying node_modules from the cache does not run them.
+    Other lockfiles do not record it, their scripts are assumed to build nothing that is not cached."""
+    for file_name in ['package-lock.json', 'npm-shrinkwrap.json']:
+        file_path = project_path / file_name
+        if file_path.exists():
+            lockfile = json.loads(file_path.read_text(encoding='utf-8'))
+            return any(package.get('hasInstallScript', False)
+                       for package in lockfile.get('packages', {}).values())
+    return False
+
+
+def __copy_tree(source: Path, destination: Path) -> bool:
+    """Copies a folder as reflinks where the file system supports them (seconds for node_modules),
+    otherwise as a plain copy. Never as hardlinks, which would let a write in one copy change the others."""
+    proc = subprocess.run(['cp', '-a', '--reflink=auto', str(source), str(destination)],
+                          capture_output=True, text=True, check=False)
+    if proc.returncode == 0:
+        return True
+    if destination.exists():
+        shutil.rmtree(destination)
+    return False
+
+
+def __store_node_modules_in_cache(node_modules_path: Path, cache_entry_path: Path) -> None:
+    temp_path = cache_entry_path.with_name(cache_entry_path.name + '.tmp-' + str(os.getpid()))
+    if not __copy_tree(node_modules_path, temp_path):
+        return
+    # tools like @babel/register write their caches there, they depend on the workspace
+    if (temp_path / '.cache').exists():
+        shutil.rmtree(temp_path / '.cache')
+    try:
+        os.rename(temp_path, cache_entry_path)
+    except OSError:
+        # another run stored the same entry in the meantime
+        shutil.rmtree(temp_path)
 
 
 def install_npm_packages(project_copy_path: str, package_manager_command: str='npm'):
-    node_modules_dir = '/node_modules'
     project_path = Path(project_copy_path) 
-    dirpath = project_path / node_modules_dir
+    dirpath = project_path / 'node_modules'
     if dirpath.exists() and dirpath.is_dir():
-        shutil.rmtree(dirpath)
-    package_lock_file = project_path / '/package-lock.json'
+        remove_in_background(str(dirpath), str(project_path.absolute().parent / '.trash'))
+
+    cache_entry_path = None
+    if _node_modules_cache_dir is not None and not __has_install_scripts(project_path):
+        cache_key = __get_node_modules_cache_key(project_path, package_manager_command)
+        cache_entry_path = Path(_node_modules_cache_dir) / (package_manager_command + '-' + cache_key)
+        if cache_entry_path.exists() and __copy_tree(cache_entry_path, dirpath):
+            # the prepare script of the project may build files outside of node_modules, which are not cached;
+            # projects whose dependencies have install scripts are not cached at all
+            subprocess.run(['cd ' + project_copy_path +
+                            ' && ' + package_manager_command + ' run prepare --if-present'],
+                            shell=True, capture_output=True, text=True, check=True)
+            return
+
+    package_lock_file = project_path / 'package-lock.json'
     install_command = 'ci' if package_lock_file.exists() else 'install'
     subprocess.run(['cd ' + project_copy_path +
                     ' && ' + package_manager_command + ' ' + install_command],
                     shell=True, capture_output=True, text=True, check=True)
 
+    if cache_entry_path is not None and dirpath.exists():
+        cache_entry_path.parent.mkdir(parents=True, exist_ok=True)
+        __store_node_modules_in_cache(dirpath, cache_entry_path)
+
 
 def fix_eslint_issues(code: str, dirty_path: str, package_manager_command: str='npx') -> str:
     patch_file_path = dirty_path + "/patch.js"
@@ -42,10 +169,8 @@ def fix_eslint_issues(code: str, dirty_path: str, package_manager_command: str='
     return code
 
 
-def __extract_eslint_error(message: dict[str, str], file_path: str) -> LintError:
+def __extract_eslint_error(message: dict[str, str], file_path: str, content: list[str]) -> LintError:
     target_line = int(message['line'])
-    with open(file_path, 'r') as code_file:
-        content = code_file.readlines()
     erroneous_code = content[target_line - 1] if target_line - 1 < len(content) else ''
 
     error: LintError = {
@@ -63,15 +188,51 @@ def __get_eslint_errors_from_json_output(output: bytes | str) -> list[LintError]
     lint_info = json.loads(output)
     errors: list[LintError] = []
     for file_object in lint_info:
+        if len(file_object['messages']) == 0:
+            continue
+        file_path = file_object['filePath']
+        with open(file_path, 'r') as code_file:
+            content = code_file.readlines()
         for message in file_object['messages']:
-            file_path = file_object['filePath']
-            error = __extract_eslint_error(message, file_path)
+            error = __extract_eslint_error(message, file_path, content)
             errors.append(error)
 
     return errors
 
 
-def get_eslint_errors(dirty_path: str, lint_command: str) -> list[LintError]:
+def __get_max_warnings(lint_command: str) -> int:
+    max_warnings_match = re.search(r'--max-warnings[ =](\d+)', lint_command)
+    if max_warnings_match is None:
+        return -1
+    return int(max_warnings_match.group(1))
+
+
+def __get_eslint_errors_from_server(dirty_path: str, lint_command: str, files: list[str]) -> list[LintError] | None:
+    try:
+        results = lint_files_with_server(dirty_path, lint_command, files, _lint_timeout)
+    except NodeServerTimeout:
+        raise CommandTimeoutError(lint_command, _lint_timeout)
+    except NodeServerError as e:
+        get_logger().info("ESLint server failed, running the lint command: " + str(e).splitlines()[0])
+        return None
+
+    # the lint command only fails (and its errors are read) on errors or too many warnings
+    error_count = sum(result['errorCount'] + result.get('fatalErrorCount', 0) for result in results)
+    warning_count = sum(result['warningCount'] for result in results)
+    max_warnings = __get_max_warnings(lint_command)
+    if error_count == 0 and (max_warnings < 0 or warning_count <= max_warnings):
+        return []
+    return __get_eslint_errors_from_json_output(json.dumps(results))
+
+
+def get_eslint_errors(dirty_path: str, lint_command: str, files: list[str] | None = None) -> list[LintError]:
+    """Runs the lint command in the workspace. With the ESLint server enabled, only the given files
+    (relative to the workspace) are linted, without them or with the server disabled the whole project is."""
+    if files is not None and _eslint_server_enabled:
+        errors = __get_eslint_errors_from_server(dirty_path, lint_command, files)
+        if errors is not None:
+            return errors
+
     try: 
         eslint_json_name = 'eslint-output.json'
         output_options = ' --format json -o ' + eslint_json_name
@@ -79,15 +240,14 @@ def get_eslint_errors(dirty_path: str, lint_command: str) -> list[LintError]:
         
         eslint_json_output_path = dirty_path + '/' + eslint_json_name
 
-        subprocess.run(['cd ' + dirty_path + ' && ' + lint_command],
-                        shell=True, capture_output=True, text=True, check=True, timeout=120)
+        run_in_process_group(lint_command, dirty_path, _lint_timeout, check=True)
         
         if os.path.exists(eslint_json_output_path):
             os.remove(eslint_json_output_path) 
         return []
 
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+    except subprocess.CalledProcessError:
         with open(eslint_json_output_path, 'r') as eslint_json_file:
             eslint_json_output = eslint_json_file.read()
 
@@ -120,110 +280,111 @@ def __get_mocha_errors_from_json_output(stdout: bytes | str, line_pattern: str)
     return errors
 
 
-def get_mocha_errors(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError]:
+def __get_mocha_errors_from_daemon(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError] | None:
+    if dirty_path in _failed_test_daemon_paths:
+        return None
     try:
-        mocha_json_name = 'mocha-output.json'
-        output_options = ' --reporter json --reporter-option output=' + mocha_json_name
-        test_command += output_options
-        
-        mocha_json_output_path = dirty_path + '/' + mocha_json_name
-        
-        subprocess.run(['cd ' + dirty_path + ' && ' + test_command],
-                        shell=True, capture_output=True, text=True, check=True, timeout=120)
-        
-        if os.path.exists(mocha_json_output_path):
-            os.remove(mocha_json_output_path) 
-        return []
+        failures = run_mocha_in_daemon(dirty_path, test_command, _test_timeout)
+    except NodeServerTimeout:
+        raise CommandTimeoutError(test_command, _test_timeout)
+    except NodeServerError as e:
+        # failing tests and test files that do not load are reported as failures, this is the daemon not working
+        get_logger().info("Mocha daemon failed in " + dirty_path + ", running the test command from now on: "
+                          + str(e).splitlines()[0])
+        _failed_test_daemon_paths.add(dirty_path)
+        return None
+    errors = __get_mocha_errors_from_json_output(json.dumps({'failures': failures}), line_pattern)
+    return errors if _max_test_failures is None else errors[:_max_test_failures]
+
+
+def __parse_failure_stream(lines: Iterator[str], line_pattern: str, to_error, max_failures: int | None) -> list[TestError]:
+    """Collects failures written as '["fail", {...}]' lines (mocha json-stream, jest stream reporter),
+    ignoring anything else the tests print"""
+    errors: list[TestError] = []
+    for line in lines:
+        if not line.startswith('["fail"'):
+            continue
+        try:
+            _, failure = json.loads(line)
+        except ValueError:
+            continue
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-        with open(mocha_json_output_path, 'r') as mocha_json_file:
-            mocha_json_output = mocha_json_file.read()
+        error = to_error(failure)
+        line_match = re.search(line_pattern, error['message_stack'])
+        if line_match is not None:
+            error['target_line'] = int(line_match.group(1))
+        errors.append(error)
 
-        errors = __get_mocha_errors_from_json_output(mocha_json_output, line_pattern)
+        if max_failures is not None and len(errors) >= max_failures:
+            break
+    return errors
 
-        if os.path.exists(mocha_json_output_path):
-            os.remove(mocha_json_output_path) 
-        return errors
-    
-def get_mocha_errors_from_stdout(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError]:
-    try:
-        mocha_json_name = 'mocha-output.json'
-        output_options = ' --reporter json > ' + mocha_json_name
-        test_command += output_options
-        
-        mocha_json_output_path = dirty_path + '/' + mocha_json_name
-        
-        subprocess.run(['cd ' + dirty_path + ' && ' + test_command],
-                        shell=True, capture_output=True, text=True, check=True, timeout=120)
-        
-        if os.path.exists(mocha_json_output_path):
-            os.remove(mocha_json_output_path) 
-        return []
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-        with open(mocha_json_output_path, 'r') as mocha_json_file:
-            mocha_json_output = mocha_json_file.read()
+def __get_crash_error(test_command: str, run: StreamedRun, line_pattern: str) -> TestError:
+    """Error for a test run that failed without reporting a failing test, e. g. a module that does not load"""
+    message_stack = run['stderr'] if run['stderr'] != '' else \
+        "'" + test_command + "' exited with code " + str(run['returncode']) + " without reporting a failing test"
+    line_match = re.search(line_pattern, message_stack)
+    return {'expectation': None,
+            'message_stack': message_stack,
+            'test_file': None,
+            'target_line': int(line_match.group(1)) if line_match is not None else None}
 
-        errors = __get_mocha_errors_from_json_output(mocha_json_output, line_pattern)
 
-        if os.path.exists(mocha_json_output_path):
-            os.remove(mocha_json_output_path) 
-        return errors    
+def __to_mocha_error(failure: dict) -> TestError:
+    return {'expectation': failure['fullTitle'],
+            'message_stack': failure.get('stack') or str(failure.get('err', '')),
+            'test_file': failure.get('file'),
+            'target_line': None}
 
 
-def __get_jest_errors_from_json_output(jest_json_output: str, line_pattern: str) -> list[TestError]:
-    test_info = json.loads(jest_json_output)
-    test_results = test_info['testResults']
+def get_mocha_errors(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError]:
+    if _test_daemon_enabled:
+        errors = __get_mocha_errors_from_daemon(dirty_path, test_command, line_pattern)
+        if errors is not None:
+            return errors
+
+    test_command += ' --reporter json-stream'
+    errors, run = run_streaming(
+        test_command, dirty_path,
+        lambda lines: __parse_failure_stream(lines, line_pattern, __to_mocha_error, _max_test_failures),
+        timeout=_test_timeout)
+
+    if run['returncode'] == 0:
+        return []
+    if len(errors) == 0 and not run['stopped_early']:
+        errors.append(__get_crash_error(test_command, run, line_pattern))
+    return errors
 
-    errors: list[TestError] = []
-    for test in test_results:
-        if test['status'] == "failed":
-            for assertion in test['assertionResults']:
-                if assertion['status'] == "failed":
-                    ansi_code_escape_pattern = r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])'
-                    cleaned_messages = re.sub(ansi_code_escape_pattern, "", "".join(assertion['failureMessages']))
-                    
-                    error: TestError = {
-                        'expectation': assertion['fullName'],
-                        'message_stack': cleaned_messages,
-                        'test_file': test['name'],
-                        'target_line': None
-                    }
-                    line_match = re.search(line_pattern, error['message_stack'])
-                    if line_match is not None:
-                        error['target_line'] = int(line_match.group(1))
 
-                    errors.append(error)
+def get_mocha_errors_from_stdout(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError]:
+    """Kept for the projects using it, mocha reports are read from stdout by get_mocha_errors as well"""
+    return get_mocha_errors(dirty_path, test_command, line_pattern)
 
-    return errors
 
+def __to_jest_error(failure: dict) -> TestError:
+    ansi_code_escape_pattern = r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])'
+    cleaned_messages = re.sub(ansi_code_escape_pattern, "", "".join(failure['failureMessages']))
+    return {'expectation': failure['fullName'],
+            'message_stack': cleaned_messages,
+            'test_file': failure['testFilePath'],
+            'target_line': None}
 
-def get_jest_errors(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError]:
-    try:
-        jest_json_name = 'jest-output.json'
-        output_options = ' --json --outputFile=' + jest_json_name
-        test_command +=  output_options
 
-        jest_json_output_path = dirty_path + '/' + jest_json_name
+def get_jest_errors(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError]:
+    test_command += ' --reporters=' + JEST_STREAM_REPORTER_PATH
+    errors, run = run_streaming(
+        test_command, dirty_path,
+        lambda lines: __parse_failure_stream(lines, line_pattern, __to_jest_error, _max_test_failures),
+        timeout=_test_timeout)
 
-        subprocess.run(['cd ' + dirty_path + ' && ' + test_command],
-                        shell=True, capture_output=True, text=True, check=True, timeout=120)
-        
-        if os.path.exists(jest_json_output_path):
-            os.remove(jest_json_output_path) 
-        
+    if run['returncode'] == 0:
         return []
+    if len(errors) == 0 and not run['stopped_early']:
+        errors.append(__get_crash_error(test_command, run, line_pattern))
+    return errors
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-        with open(jest_json_output_path) as jest_json_file:
-            jest_json_output = jest_json_file.read()
-
-        errors = __get_jest_errors_from_json_output(jest_json_output, line_pattern)
 
-        if os.path.exists(jest_json_output_path):
-            os.remove(jest_json_output_path) 
-        return errors
-    
 def __get_vitest_errors_from_json_output(jest_json_output: str, line_pattern: str) -> list[TestError]:
     test_info = json.loads(jest_json_output)
     test_results = test_info['testResults']
@@ -258,15 +419,14 @@ def get_vitest_errors(dirty_path: str, test_command: str, line_pattern: str) ->
 
         vitest_json_output_path = dirty_path + '/' + vitest_json_name
 
-        subprocess.run(['cd ' + dirty_path + ' && ' + test_command],
-                        shell=True, capture_output=True, text=True, check=True, timeout=120)
+        run_in_process_group(test_command, dirty_path, _test_timeout, check=True)
         
         if os.path.exists(vitest_json_output_path):
             os.remove(vitest_json_output_path) 
         
         return []
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+    except subprocess.CalledProcessError:
         with open(vitest_json_output_path) as jest_json_file:
             jest_json_output = jest_json_file.read()
 
@@ -274,24 +434,23 @@ def get_vitest_errors(dirty_path: str, test_command: str, line_pattern: str) ->
 
         if os.path.exists(vitest_json_output_path):
             os.remove(vitest_json_output_path) 
-        return errors   
-    
-# function needed because of a bug in the output of tap that breaks the YAML parsing    
-def read_fixed_tap_file(test_output):
+        return errors
+
+# function needed because of a bug in the output of tap that breaks the YAML parsing
+def fix_tap_lines(lines: Iterable[str]) -> Iterator[str]:
     inside_yaml = False
     inside_braces = False
-    output_lines = []
 
-    for line in test_output.splitlines():
+    for line in lines:
         stripped_line = line.strip()
 
         if stripped_line == "---":
             inside_yaml = True
-            output_lines.append(line)
+            yield line
             continue
         elif stripped_line == "..." and inside_yaml:
             inside_yaml = False
-            output_lines.append(line)
+            yield line
             continue
 
         if inside_yaml:
@@ -302,20 +461,38 @@ def read_fixed_tap_file(test_output):
                 line = '   ' + line
 
             if inside_braces and not stripped_line.endswith("{"):
-                output_lines.append('  ' + line)
+                yield '  ' + line
             else:
-                output_lines.append(line)
+                yield line
         else:
-            output_lines.append(line)
+            yield line
+
+
+class __TapLines:
+    """Lines in the shape tap's parser reads them from, a file used in a with statement"""
+
+    def __init__(self, lines: Iterable[str]):
+        self.__lines = iter(lines)
+
+    def __enter__(self):
+        return self
 
-    return '\n'.join(output_lines)
+    def __exit__(self, *args):
+        return False
 
-def __parse_tap_output(test_output: str, file_line_pattern)-> list[TestError]:
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self.__lines)
+
+
+def __parse_tap_stream(output_lines: Iterator[str], file_line_pattern, max_failures: int | None) -> list[TestError]:
     tap_parser = parser.Parser()
-    tap_file = tap_parser.parse_text(read_fixed_tap_file(test_output))
-    
+    lines = __TapLines(fix_tap_lines(line.rstrip('\n') for line in output_lines))
+
     errors: list[TestError] = []
-    for line in tap_file:
+    for line in tap_parser.parse(lines):
         if line.category == 'test' and not line.ok:
             stack = None
             if hasattr(line.yaml_block, '__getitem__'):
@@ -346,45 +523,36 @@ def __parse_tap_output(test_output: str, file_line_pattern)-> list[TestError]:
             }
             errors.append(error)
 
+            if max_failures is not None and len(errors) >= max_failures:
+                break
+
     return errors
 
 def get_tap_errors(dirty_path: str, test_command: str, line_pattern: str) -> list[TestError]:
-    try:
-        output_file_name = 'output.tap'
-        test_command = test_command + ' > ' + output_file_name
-        
-        output_path = dirty_path + '/' + output_file_name
-        
-        result = subprocess.run(test_command, cwd=dirty_path, shell=True, check=True, timeout=120, stderr=subprocess.PIPE)
-        if result.returncode != 0:
-            pass
-            # raise subprocess.CalledProcessError(result.returncode, test_command)
-        
-        if os.path.exists(output_path):
-            os.remove(output_path) 
-        return []
+    errors, run = run_streaming(
+        test_command, dirty_path,
+        lambda lines: __parse_tap_stream(lines, line_pattern, _max_test_failures),
+        timeout=_test_timeout)
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-        with open(output_path, 'r') as output_file:
-            test_output = output_file.read()
-
-        errors = __parse_tap_output(test_output, line_pattern)
+    if run['returncode'] == 0:
+        return []
 
-        if len(errors) == 0 and e.stderr is not None:
-            lines = e.stderr.splitlines()
-            first_line = lines[0].decode().rsplit(':', 1)
-            test_file = first_line[0]
+    if len(errors) == 0 and not run['stopped_early']:
+        # node reports an uncaught error while loading a test file as 'file:line', then the code and the stack
+        lines = run['stderr'].splitlines()
+        location_match = re.fullmatch(r'(.+):(\d+)', lines[0].strip()) if len(lines) > 0 else None
+        if location_match is None:
+            errors.append(__get_crash_error(test_command, run, line_pattern))
+        else:
+            test_file = location_match.group(1)
             if test_file.startswith('file://'):
                 test_file = test_file[7:]
-            test_line = first_line[1]
             error: TestError = {
                 'expectation': None,
-                'message_stack': b'\n'.join(lines[1:]),
+                'message_stack': '\n'.join(lines[1:]),
                 'test_file': test_file,
-                'target_line': int(test_line) if test_line is not None else 0
+                'target_line': int(location_match.group(2))
             }
             errors.append(error)
 
-        if os.path.exists(output_path):
-            os.remove(output_path) 
-        return errors
\ No newline at end of file
+    return errors
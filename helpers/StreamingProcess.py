@@ -0,0 +1,118 @@
+import os
+import signal
+import subprocess
+import threading
+from typing import Callable, Iterator, TypedDict, TypeVar
+
+STDERR_HEAD_SIZE = 64 * 1024
+
+T = TypeVar('T')
+
+
+class CommandTimeoutError(Exception):
+    def __init__(self, command: str, timeout: float):
+        self.command = command
+        self.timeout = timeout
+        super().__init__("Command '{}' timed out after {:.0f}s".format(command, timeout))
+
+
+class StreamedRun(TypedDict):
+    returncode: int | None
+    stopped_early: bool
+    stderr: str
+
+
+class __OutputLines:
+    """Lines of the output of a process, remembering whether all of them were read"""
+
+    def __init__(self, stream):
+        self.__stream = stream
+        self.exhausted = False
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        line = self.__stream.readline()
+        if line == '':
+            self.exhausted = True
+            raise StopIteration
+        return line
+
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    """Kills the process and everything it started, e. g. the Node processes started by a shell running npx"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_in_process_group(command: str, cwd: str, timeout: float, check: bool = False) -> int:
+    """Runs the shell command in its own process group, so the whole tree can be killed when the timeout expires,
+    and raises CommandTimeoutError then. Returns the exit code, with check a non-zero one raises CalledProcessError."""
+    process = subprocess.Popen(command, cwd=cwd, shell=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_group(process)
+        process.wait()
+        raise CommandTimeoutError(command, timeout)
+
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return returncode
+
+
+def run_streaming(command: str, cwd: str, consume: Callable[[Iterator[str]], T],
+                  timeout: float) -> tuple[T, StreamedRun]:
+    """Runs the shell command in its own process group and passes its stdout line by line to consume while it runs.
+    If consume returns before the output ended, the process is stopped. Only the beginning of stderr is kept.
+    When the timeout expires the whole process group is killed and CommandTimeoutError is raised."""
+    process = subprocess.Popen(command, cwd=cwd, shell=True, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True, errors='replace', start_new_session=True)
+
+    timed_out = threading.Event()
+
+    def expire() -> None:
+        timed_out.set()
+        kill_process_group(process)
+
+    timer = threading.Timer(timeout, expire)
+    timer.start()
+
+    stderr_head: list[str] = []
+
+    def read_stderr() -> None:
+        size = 0
+        for line in process.stderr:
+            if size < STDERR_HEAD_SIZE:
+                stderr_head.append(line)
+                size += len(line)
+
+    stderr_reader = threading.Thread(target=read_stderr, daemon=True)
+    stderr_reader.start()
+
+    lines = __OutputLines(process.stdout)
+    stopped_early = False
+    try:
+        result = consume(lines)
+    finally:
+        if not lines.exhausted and process.poll() is None:
+            stopped_early = not timed_out.is_set()
+            kill_process_group(process)
+        process.wait()
+        timer.cancel()
+        stderr_reader.join(timeout=5)
+        process.stdout.close()
+
+    if timed_out.is_set():
+        raise CommandTimeoutError(command, timeout)
+
+    run: StreamedRun = {
+        'returncode': None if stopped_early else process.returncode,
+        'stopped_early': stopped_early,
+        'stderr': ''.join(stderr_head)
+    }
+    return result, run
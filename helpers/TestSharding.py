@@ -0,0 +1,46 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from interfaces.ProjectInterface import ProjectInterface
+from interfaces.TestError import TestError
+from helpers.CoverageHelper import get_test_files
+
+_shard_count = 1
+
+
+def set_shard_count(shard_count: int) -> None:
+    """Number of processes the test files of a project are split across, 1 runs the suite as the project does"""
+    global _shard_count
+    _shard_count = shard_count
+
+
+def split_into_shards(path: str, test_files: list[str], shard_count: int) -> list[list[str]]:
+    """Splits the test files into shards of about the same size, largest files first onto the smallest shard"""
+    shards: list[list[str]] = [[] for _ in range(min(shard_count, len(test_files)))]
+    shard_sizes = [0] * len(shards)
+    sizes = {test_file: os.path.getsize(os.path.join(path, test_file)) for test_file in test_files}
+
+    for test_file in sorted(test_files, key=lambda test_file: (-sizes[test_file], test_file)):
+        smallest = shard_sizes.index(min(shard_sizes))
+        shards[smallest].append(test_file)
+        shard_sizes[smallest] += sizes[test_file]
+    return [sorted(shard) for shard in shards]
+
+
+def get_test_errors(project: ProjectInterface, test_files: list[str] | None = None) -> list[TestError]:
+    """Runs the tests of the project (or the given test files) in the dirty workspace, split across shards
+    running in parallel when sharding is enabled and supported by the project. The errors of all shards are merged
+    in shard order."""
+    if _shard_count <= 1 or project.test_files_glob is None or not project.supports_test_sharding:
+        if test_files is None:
+            return project.get_test_errors()
+        return project.get_test_errors(test_files)
+
+    if test_files is None:
+        test_files = get_test_files(project, project.dirty_path)
+    shards = split_into_shards(project.dirty_path, test_files, _shard_count)
+    if len(shards) <= 1:
+        return project.get_test_errors(test_files)
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        results = list(executor.map(project.get_test_errors, shards))
+    return [error for errors in results for error in errors]
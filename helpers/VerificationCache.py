@@ -0,0 +1,69 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, TypeVar
+from helpers.PatchEngine import get_patched_paths
+from util.Logger import get_logger
+
+T = TypeVar('T')
+
+
+def __hash_file__(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+class VerificationCache:
+    """Lint and test results by the state of the workspace they ran in, the commit of the project plus the content of
+    the files patched so far. Fix attempts returning earlier code and restored originals reuse the results."""
+
+    def __init__(self, project_path: str, commit: str, max_entries: int = 1024):
+        self.project_path = project_path
+        self.commit = commit
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.__results: OrderedDict[tuple, list] = OrderedDict()
+        self.__original_hashes: dict[str, str | None] = {}
+        self.__lock = threading.Lock()
+
+    def __get_original_hash(self, relative_path: str) -> str | None:
+        if relative_path not in self.__original_hashes:
+            original_path = os.path.join(self.project_path, relative_path)
+            self.__original_hashes[relative_path] = __hash_file__(original_path) if os.path.exists(original_path) else None
+        return self.__original_hashes[relative_path]
+
+    def get_state_key(self, workspace_path: str) -> str:
+        """Hash of the commit and the files of the workspace which differ from the project"""
+        digest = hashlib.sha1(self.commit.encode())
+        for path in sorted(get_patched_paths(workspace_path)):
+            relative_path = os.path.relpath(path, workspace_path)
+            content_hash = __hash_file__(path)
+            with self.__lock:
+                original_hash = self.__get_original_hash(relative_path)
+            # a file patched back to its original content is the same state as an untouched one
+            if content_hash != original_hash:
+                digest.update(relative_path.encode())
+                digest.update(content_hash.encode())
+        return digest.hexdigest()
+
+    def get_or_run(self, kind: str, workspace_path: str, arguments: list[str] | None, run: Callable[[], list[T]]) -> list[T]:
+        """The result of an earlier run of the same kind (e. g. 'lint') and arguments on the same state of the
+        workspace, otherwise the result of run()"""
+        key = (kind, workspace_path, None if arguments is None else tuple(arguments),
+               self.get_state_key(workspace_path))
+        with self.__lock:
+            if key in self.__results:
+                self.hits += 1
+                self.__results.move_to_end(key)
+                get_logger().info("Reusing {} result of an identical earlier state".format(kind))
+                return list(self.__results[key])
+            self.misses += 1
+
+        result = run()
+        with self.__lock:
+            self.__results[key] = list(result)
+            if len(self.__results) > self.max_entries:
+                self.__results.popitem(last=False)
+        return result
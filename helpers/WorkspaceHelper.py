@@ -0,0 +1,92 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import uuid
+from typing import Literal
+
+ProvisioningMethod = Literal['reflink', 'worktree', 'copy']
+
+
+def __run(command: list[str]) -> bool:
+    proc = subprocess.run(command, capture_output=True, text=True, check=False)
+    return proc.returncode == 0
+
+
+def __clone_with_reflinks(source_path: str, destination_path: str) -> bool:
+    """Copy-on-write clone, files share their blocks until one side writes to them (btrfs, XFS, APFS)"""
+    if sys.platform == 'darwin':
+        command = ['cp', '-c', '-R', source_path, destination_path]
+    else:
+        command = ['cp', '-a', '--reflink=always', source_path, destination_path]
+
+    if __run(command):
+        return True
+
+    if os.path.exists(destination_path):
+        shutil.rmtree(destination_path)
+    return False
+
+
+def __is_clean_git_repo(path: str) -> bool:
+    proc = subprocess.run(['git', '-C', path, 'status', '--porcelain'],
+                          capture_output=True, text=True, check=False)
+    return proc.returncode == 0 and proc.stdout.strip() == '' and os.path.exists(os.path.join(path, '.git'))
+
+
+def __add_git_worktree(source_path: str, destination_path: str) -> bool:
+    """Checks out the commit of the source into a new worktree, sharing the object store.
+    Only used for clean repositories, uncommitted changes would not be part of the worktree."""
+    if not __is_clean_git_repo(source_path):
+        return False
+    return __run(['git', '-C', source_path, 'worktree', 'add', '--detach', '--force',
+                  os.path.abspath(destination_path), 'HEAD'])
+
+
+def remove_in_background(path: str, trash_dir: str | None = None) -> None:
+    """Moves the folder out of the way and deletes it in a background thread, so removing large trees
+    (old workspaces, node_modules) does not block. The trash folder defaults to '.trash' next to the folder
+    and has to be on the same filesystem, otherwise the folder is deleted right away."""
+    if not os.path.exists(path):
+        return
+
+    if trash_dir is None:
+        trash_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.trash')
+    os.makedirs(trash_dir, exist_ok=True)
+    stale_path = os.path.join(trash_dir, os.path.basename(path) + '-' + uuid.uuid4().hex[:8])
+
+    try:
+        os.rename(path, stale_path)
+    except OSError:
+        shutil.rmtree(path)
+        return
+
+    # not a daemon thread, the interpreter waits for it to finish before exiting
+    threading.Thread(target=shutil.rmtree, args=(stale_path,), kwargs={'ignore_errors': True}).start()
+
+
+def remove_workspace(source_path: str, destination_path: str) -> None:
+    if not os.path.exists(destination_path):
+        return
+
+    remove_in_background(destination_path)
+
+    if os.path.exists(os.path.join(source_path, '.git')):
+        # drops the metadata of worktrees whose folder is gone
+        __run(['git', '-C', source_path, 'worktree', 'prune'])
+
+
+def create_workspace(source_path: str, destination_path: str) -> ProvisioningMethod:
+    """Creates a copy of the source folder, preferring reflinks, then git worktrees and falling back to a full copy.
+    Returns the method that was used."""
+    remove_workspace(source_path, destination_path)
+
+    if __clone_with_reflinks(source_path, destination_path):
+        return 'reflink'
+
+    if __add_git_worktree(source_path, destination_path):
+        return 'worktree'
+
+    shutil.copytree(source_path, destination_path, dirs_exist_ok=True, symlinks=True)
+    return 'copy'
@@ -0,0 +1,74 @@
+// Keeps an ESLint instance of the workspace it is started in alive and lints files on request.
+// Protocol: one JSON object per line on stdin, {"id": 1, "files": ["lib/a.js"]},
+// answered by one JSON object per line on stdout, {"id": 1, "results": [...]} with the results
+// of the ESLint json formatter, or {"id": 1, "error": "..."}.
+// Options are passed as a JSON object in the first argument, e. g. {"overrideConfigFile": ".eslintrc"}.
+'use strict'
+
+const path = require('path')
+const readline = require('readline')
+const { createRequire } = require('module')
+
+const workspace = process.cwd()
+const options = process.argv.length > 2 ? JSON.parse(process.argv[2]) : {}
+const requireFromWorkspace = createRequire(path.join(workspace, 'package.json'))
+
+// stdout carries the responses, anything else written to it (e. g. console.log in tests) goes to stderr
+const writeResponse = process.stdout.write.bind(process.stdout)
+process.stdout.write = process.stderr.write.bind(process.stderr)
+
+function send (response) {
+  writeResponse(JSON.stringify(response) + '\n')
+}
+
+async function createESLint () {
+  const eslint = requireFromWorkspace('eslint')
+  const ESLint = eslint.loadESLint ? await eslint.loadESLint() : eslint.ESLint
+  if (ESLint === undefined) {
+    throw new Error('ESLint API not available, eslint 7 or newer is required')
+  }
+  return new ESLint({ cwd: workspace, ...options })
+}
+
+async function lint (eslint, files) {
+  const lintedFiles = []
+  for (const file of files) {
+    if (!(await eslint.isPathIgnored(file))) {
+      lintedFiles.push(file)
+    }
+  }
+  if (lintedFiles.length === 0) {
+    return []
+  }
+  return eslint.lintFiles(lintedFiles)
+}
+
+async function main () {
+  let eslint
+  try {
+    eslint = await createESLint()
+  } catch (error) {
+    send({ id: null, error: String(error && error.stack ? error.stack : error) })
+    process.exit(1)
+  }
+  send({ id: null, ready: true })
+
+  // requests are answered one after the other, in the order they arrive
+  let queue = Promise.resolve()
+  const lines = readline.createInterface({ input: process.stdin })
+  lines.on('line', (line) => {
+    queue = queue.then(async () => {
+      let request
+      try {
+        request = JSON.parse(line)
+        const results = await lint(eslint, request.files)
+        send({ id: request.id, results })
+      } catch (error) {
+        send({ id: request ? request.id : null, error: String(error && error.stack ? error.stack : error) })
+      }
+    })
+  })
+  lines.on('close', () => queue.then(() => process.exit(0)))
+}
+
+main()
@@ -0,0 +1,35 @@
+// Jest reporter writing one line per failing test to stdout as soon as its test file finished,
+// ["fail", {"fullName": ..., "failureMessages": [...], "testFilePath": ...}], so failures can be read while jest runs.
+// A test file which failed to run (e. g. a syntax error in a module it imports) is reported as one failure.
+'use strict'
+
+class JestStreamReporter {
+  onTestResult (test, testResult) {
+    if (testResult.testExecError) {
+      this.write({
+        fullName: testResult.testFilePath,
+        failureMessages: [testResult.failureMessage || String(testResult.testExecError.message)],
+        testFilePath: testResult.testFilePath
+      })
+    }
+    for (const assertion of testResult.testResults) {
+      if (assertion.status === 'failed') {
+        this.write({
+          fullName: assertion.fullName,
+          failureMessages: assertion.failureMessages,
+          testFilePath: testResult.testFilePath
+        })
+      }
+    }
+  }
+
+  write (failure) {
+    process.stdout.write(JSON.stringify(['fail', failure]) + '\n')
+  }
+
+  getLastError () {
+    return undefined
+  }
+}
+
+module.exports = JestStreamReporter
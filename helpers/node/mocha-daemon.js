@@ -0,0 +1,192 @@
+// Keeps a warm mocha of the workspace it is started in and runs the suite on request.
+// The arguments are the mocha command line arguments, e. g. ["--require", "should", "test/"];
+// they are merged with .mocharc/package.json by mocha itself. The required modules are loaded once, at start.
+// Protocol: one JSON object per line on stdin, {"id": 1, "arguments": ["--require", "should", "test/a.js"]}
+// with the arguments of the run (the test files may differ from run to run, the required modules may not),
+// answered by one JSON object per line on stdout,
+// {"id": 1, "failures": [{"fullTitle": ..., "file": ..., "err": {"stack": ...}}]} or {"id": 1, "error": "..."}.
+// Before each run, the modules of the workspace whose files changed since they were loaded are dropped from
+// the require cache together with every module requiring them; node_modules and the required setup stay loaded.
+'use strict'
+
+const fs = require('fs')
+const path = require('path')
+const readline = require('readline')
+const { createRequire } = require('module')
+
+const workspace = process.cwd()
+const nodeModulesPath = path.join(workspace, 'node_modules') + path.sep
+const requireFromWorkspace = createRequire(path.join(workspace, 'package.json'))
+
+const loadedVersions = new Map()
+
+// stdout carries the responses, anything else written to it (e. g. console.log in tests) goes to stderr
+const writeResponse = process.stdout.write.bind(process.stdout)
+process.stdout.write = process.stderr.write.bind(process.stderr)
+
+function send (response) {
+  writeResponse(JSON.stringify(response) + '\n')
+}
+
+function isWorkspaceModule (filename) {
+  return filename.startsWith(workspace + path.sep) && !filename.startsWith(nodeModulesPath)
+}
+
+function getVersion (filename) {
+  try {
+    const stats = fs.statSync(filename)
+    return stats.mtimeMs + ':' + stats.size
+  } catch (error) {
+    return null
+  }
+}
+
+function recordLoadedModules () {
+  for (const filename of Object.keys(require.cache)) {
+    if (isWorkspaceModule(filename) && !loadedVersions.has(filename)) {
+      loadedVersions.set(filename, getVersion(filename))
+    }
+  }
+}
+
+function unloadChangedModules (testFiles) {
+  const parents = new Map()
+  for (const [filename, cachedModule] of Object.entries(require.cache)) {
+    for (const child of cachedModule.children) {
+      if (!parents.has(child.id)) {
+        parents.set(child.id, new Set())
+      }
+      parents.get(child.id).add(filename)
+    }
+  }
+
+  // test files are always loaded again, mocha registers their suites while loading them
+  const stale = testFiles.filter((file) => require.cache[file] !== undefined)
+  for (const [filename, version] of loadedVersions) {
+    if (require.cache[filename] !== undefined && getVersion(filename) !== version) {
+      stale.push(filename)
+    }
+  }
+
+  const unloaded = new Set()
+  while (stale.length > 0) {
+    const filename = stale.pop()
+    if (unloaded.has(filename)) {
+      continue
+    }
+    unloaded.add(filename)
+    for (const parent of parents.get(filename) || []) {
+      if (isWorkspaceModule(parent)) {
+        stale.push(parent)
+      }
+    }
+  }
+
+  for (const filename of unloaded) {
+    delete require.cache[filename]
+    loadedVersions.delete(filename)
+  }
+}
+
+async function loadRequires (requires) {
+  const runHelpers = requireFromWorkspace('mocha/lib/cli/run-helpers')
+  const plugins = await runHelpers.handleRequires(requires)
+  if (plugins && plugins.rootHooks !== undefined) {
+    return plugins
+  }
+  return { rootHooks: plugins }
+}
+
+function collectFiles (argv) {
+  // loadOptions merges the positional arguments and spec into argv._, the mocha CLI passes them on as spec
+  const collected = requireFromWorkspace('mocha/lib/cli/collect-files')({
+    spec: argv._ && argv._.length > 0 ? argv._ : ['./test'],
+    extension: argv.extension || ['js'],
+    ignore: argv.ignore || [],
+    file: argv.file || [],
+    recursive: argv.recursive,
+    sort: argv.sort
+  })
+  const files = Array.isArray(collected) ? collected : collected.files
+  return files.map((file) => path.resolve(workspace, file))
+}
+
+async function runSuite (Mocha, argv, plugins) {
+  const files = collectFiles(argv)
+  unloadChangedModules(files)
+
+  const mocha = new Mocha({ ...argv, ...plugins, reporter: Mocha.reporters.Base })
+  files.forEach((file) => mocha.addFile(file))
+  try {
+    if (typeof mocha.loadFilesAsync === 'function') {
+      await mocha.loadFilesAsync()
+    } else {
+      mocha.loadFiles()
+    }
+  } catch (error) {
+    // e. g. a syntax error in the refactored code, reported like the mocha CLI crashing while loading
+    return [{ fullTitle: null, file: null, err: { message: String(error && error.message), stack: String(error && error.stack) } }]
+  }
+
+  const failures = []
+  await new Promise((resolve) => {
+    const runner = mocha.run(() => resolve())
+    runner.on('fail', (test, error) => {
+      failures.push({
+        fullTitle: test.fullTitle(),
+        file: test.file,
+        err: { message: String(error && error.message), stack: String(error && error.stack) }
+      })
+    })
+  })
+  recordLoadedModules()
+  return failures
+}
+
+function loadOptions (args) {
+  return requireFromWorkspace('mocha/lib/cli/options').loadOptions(args)
+}
+
+function getRunOptions (args, requires) {
+  const argv = loadOptions(args)
+  if (JSON.stringify(argv.require || []) !== JSON.stringify(requires)) {
+    throw new Error('The daemon was started with other required modules: ' + JSON.stringify(requires))
+  }
+  return argv
+}
+
+async function main () {
+  let Mocha, argv, plugins
+  try {
+    const packageJson = JSON.parse(fs.readFileSync(path.join(workspace, 'package.json'), 'utf-8'))
+    if (packageJson.type === 'module') {
+      throw new Error('ES modules cannot be unloaded, the daemon only supports CommonJS projects')
+    }
+    Mocha = requireFromWorkspace('mocha')
+    argv = loadOptions(process.argv.slice(2))
+    plugins = await loadRequires(argv.require || [])
+    recordLoadedModules()
+  } catch (error) {
+    send({ id: null, error: String(error && error.stack ? error.stack : error) })
+    process.exit(1)
+  }
+  send({ id: null, ready: true })
+
+  let queue = Promise.resolve()
+  const lines = readline.createInterface({ input: process.stdin })
+  lines.on('line', (line) => {
+    queue = queue.then(async () => {
+      let request
+      try {
+        request = JSON.parse(line)
+        const runArgv = request.arguments ? getRunOptions(request.arguments, argv.require || []) : argv
+        send({ id: request.id, failures: await runSuite(Mocha, runArgv, plugins) })
+      } catch (error) {
+        send({ id: request ? request.id : null, error: String(error && error.stack ? error.stack : error) })
+      }
+    })
+  })
+  lines.on('close', () => queue.then(() => process.exit(0)))
+}
+
+main()
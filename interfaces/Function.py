@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from .LlmWrapperInterface import LLMWrapperInterface
 from .ProjectInterface import ProjectInterface
 from .PromptStrategyInterface import PromptStrategyInterface
@@ -5,26 +7,12 @@ from .LizardResult import LizardResult
 from .LintError import LintError
 from .TestError import TestError
 from helpers.LizardHelper import extract_function_code, compute_cc_from_code
-
-
-def __patch_code__(path: str, old_code: str, new_code: str) -> None:
-    with open(path, 'r') as file:
-        filedata = file.read()
-
-    idx_old = filedata.find(old_code)
-    if idx_old == -1:
-        raise Exception("Could not find in file " +
-                        path + " old code: " + old_code)
-
-    filedata = filedata.replace(old_code, new_code)
-
-    idx_new = filedata.find(new_code)
-    if idx_new == -1:
-        raise Exception("Could not find in file " +
-                        path + " new code: " + new_code)
-
-    with open(path, 'w') as file:
-        file.write(filedata)
+from helpers.FileCache import get_cached_file
+from helpers.PatchEngine import patch_range, get_current_range
+from helpers.LintErrorHelper import scope_lint_errors
+from helpers.CoverageHelper import get_test_files
+from helpers.TestSharding import get_test_errors as run_test_shards
+from util.Logger import get_logger
 
 
 def __remove_code_block_backticks__(code: str) -> str:
@@ -45,7 +33,8 @@ def __get_test_cases_from_errors__(errors: list[TestError], project: ProjectInte
 
 class Function:
     def __init__(self, lizard_result: LizardResult, project: ProjectInterface, 
-                llm_wrapper: LLMWrapperInterface, strategy: PromptStrategyInterface):
+                llm_wrapper: LLMWrapperInterface, strategy: PromptStrategyInterface,
+                code: str | None = None, prefetched_response: str | None = None):
         self.lizard_result = lizard_result
         self.llm_wrapper = llm_wrapper
         self.strategy = strategy
@@ -61,8 +50,14 @@ class Function:
         self.target_path = lizard_result.filename.replace(
             project.path, project.target_path)
 
-        code = extract_function_code(lizard_result)
+        self.byte_range = get_cached_file(self.original_path).get_byte_range(
+            lizard_result.start_line, lizard_result.end_line)
+
+        if code is None:
+            code = extract_function_code(lizard_result)
         self.history: list[str] = [code]
+        # response to the initial prompt, sent through llm_wrapper before the function was created
+        self.prefetched_response = prefetched_response
 
     @property
     def old_cc(self) -> int:
@@ -83,8 +78,8 @@ class Function:
     def __apply_dirty_changes__(self, changed_code: str):
         self.history.append(changed_code)
         
-        __patch_code__(self.dirty_path,
-                       old_code=self.history[-2], new_code=self.history[-1])
+        patch_range(self.dirty_path, self.byte_range,
+                    old_code=self.history[-2], new_code=self.history[-1])
 
     def __process_llm_code__(self, code: str) -> str:
         code_without_backticks = __remove_code_block_backticks__(code)
@@ -97,15 +92,29 @@ class Function:
         self.new_cc = new_cc
 
     def initial_refactor(self) -> None:
-        prompt = self.strategy.initial_prompt(self.history[-1])
-
-        llm_response_code = self.llm_wrapper.send_message(prompt)
+        if self.prefetched_response is not None:
+            llm_response_code = self.prefetched_response
+        else:
+            prompt = self.strategy.initial_prompt(self.history[-1])
+            llm_response_code = self.llm_wrapper.send_message(prompt)
         postprocessed_code = self.__process_llm_code__(llm_response_code)
 
         self.__apply_dirty_changes__(postprocessed_code)
         self.__update_new_cc__()
 
+    def __get_current_line_range__(self) -> tuple[int, int]:
+        """Lines the function occupies in the dirty file now (1-based, inclusive)"""
+        start, _ = get_current_range(self.dirty_path, self.byte_range)
+        start_line = get_cached_file(self.dirty_path).data[:start].count(b'\n') + 1
+        end_line = start_line + self.current_code_in_dirty.rstrip('\n').count('\n')
+        return start_line, end_line
+
     def refactor_with_lint_errors(self, errors: list[LintError]) -> None:
+        start_line, end_line = self.__get_current_line_range__()
+        function_errors = scope_lint_errors(errors, self.dirty_path, start_line, end_line)
+        # errors caused by the change but reported elsewhere (e. g. an unused import) are sent as they are
+        if len(function_errors) > 0:
+            errors = function_errors
         errors_sorted = sorted(errors, key=lambda error: error['severity'], reverse=True)
         top_errors = errors_sorted[:20]
         
@@ -145,15 +154,94 @@ class Function:
         self.__apply_dirty_changes__(postprocessed_code)
         self.__update_new_cc__()
 
+    def __get_failing_test_files__(self, errors: list[TestError]) -> list[str] | None:
+        """Test files of the errors relative to the dirty workspace, None if any of them is unknown"""
+        if self.project.test_files_glob is None:
+            return None
+
+        dirty_path = os.path.abspath(self.project.dirty_path)
+        test_files = set(get_test_files(self.project, dirty_path))
+        failing_test_files: set[str] = set()
+        for error in errors:
+            if error['test_file'] is None:
+                return None
+            test_file = os.path.relpath(os.path.join(dirty_path, error['test_file']), dirty_path)
+            if test_file not in test_files:
+                return None
+            failing_test_files.add(test_file)
+        return sorted(failing_test_files)
+
+    def __memoized__(self, kind: str, arguments: list[str] | None, run):
+        if self.project.verification_cache is None:
+            return run()
+        return self.project.verification_cache.get_or_run(kind, self.project.dirty_path, arguments, run)
+
+    def get_lint_errors(self, full: bool = False) -> list[LintError]:
+        """Lints the file of the function (or the whole dirty workspace, depending on the project and full),
+        leaving out errors the project already had before the refactoring"""
+        if full:
+            errors = self.__memoized__('lint', None, self.project.get_lint_errors)
+        else:
+            files = [self.relative_path]
+            errors = self.__memoized__('lint', files, lambda: self.project.get_lint_errors(files))
+        if self.project.baseline is not None:
+            errors = self.project.baseline.new_lint_errors(errors, self.project.dirty_path)
+        return errors
+
+    def __run_tests__(self, test_files: list[str] | None = None) -> list[TestError]:
+        errors = self.__memoized__('test', test_files, lambda: run_test_shards(self.project, test_files))
+
+        if self.project.baseline is not None:
+            errors = self.project.baseline.new_test_errors(errors, self.project.dirty_path)
+        return errors
+
+    def get_test_errors(self, previous_errors: list[TestError] | None = None,
+                        full_suite: bool = False) -> list[TestError]:
+        """Runs the tests covering the function when the project has a test impact map, all tests otherwise.
+        With the errors of a previous run, the test files that failed run first and if they still fail
+        their errors are returned without running the others.
+        Tests failing in the baseline of the project are not reported."""
+        if full_suite:
+            return self.__run_tests__()
+
+        if previous_errors is not None:
+            failing_test_files = self.__get_failing_test_files__(previous_errors)
+            if failing_test_files is not None:
+                test_errors = self.__run_tests__(failing_test_files)
+                if len(test_errors) > 0:
+                    get_logger().info("Previously failing test files still fail, skipping the other tests")
+                    return test_errors
+
+        test_files = None
+        if self.project.test_impact_map is not None:
+            test_files = self.project.test_impact_map.get_covering_tests(
+                self.relative_path, self.lizard_result.start_line, self.lizard_result.end_line)
+
+        return self.__run_tests__(test_files)
+
+    def get_lint_and_test_errors(self, previous_test_errors: list[TestError] | None = None
+                                 ) -> tuple[list[LintError], list[TestError]]:
+        """Lints and tests the current code at the same time, see get_lint_errors and get_test_errors"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            lint_future = executor.submit(self.get_lint_errors)
+            test_future = executor.submit(self.get_test_errors, previous_test_errors)
+            return lint_future.result(), test_future.result()
+
     def restore_original_code(self) -> None:
-        __patch_code__(self.dirty_path,
-                       old_code=self.history[-1], new_code=self.history[0])
+        patch_range(self.dirty_path, self.byte_range,
+                    old_code=self.history[-1], new_code=self.history[0])
         self.history.append(self.history[0])
         self.new_cc = self.old_cc
 
     def apply_changes_to_target(self) -> None:
-        __patch_code__(self.target_path,
-                       old_code=self.history[0], new_code=self.history[-1])
+        patch_range(self.target_path, self.byte_range,
+                    old_code=self.history[0], new_code=self.history[-1])
+
+    def apply_changes_to_workspace(self, workspace_path: str) -> None:
+        """Applies the improvement to another copy of the project, e. g. the dirty workspace of another worker"""
+        path = self.original_path.replace(self.project.path, workspace_path)
+        patch_range(path, self.byte_range,
+                    old_code=self.history[0], new_code=self.history[-1])
         
     def contains_lines(self, start_line: int, end_line: int) -> bool:
         if start_line >= self.lizard_result.start_line and start_line <= self.lizard_result.end_line:
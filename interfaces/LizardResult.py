@@ -1,4 +1,23 @@
-from lizard import FunctionInfo  # type: ignore
+class LizardResult:
+    """Compact record of the fields of lizard's FunctionInfo used by the tool.
+    Lizard objects also carry parameters, tokens and fan-in/fan-out data, so they are converted
+    right after the analysis instead of being kept alive for the whole run.
+    Named differently from FunctionInfo to avoid confusion with the Function type."""
 
-LizardResult = FunctionInfo
-"""Alias for type FunctionInfo from lizard. To avoid confusion with the Function type"""
+    __slots__ = ('filename', 'name', 'long_name', 'start_line', 'end_line', 'cyclomatic_complexity', 'nloc')
+
+    def __init__(self, filename: str, name: str, long_name: str, start_line: int, end_line: int,
+                 cyclomatic_complexity: int, nloc: int):
+        self.filename = filename
+        self.name = name
+        self.long_name = long_name
+        self.start_line = start_line
+        self.end_line = end_line
+        self.cyclomatic_complexity = cyclomatic_complexity
+        self.nloc = nloc
+
+    @staticmethod
+    def from_function_info(function_info) -> 'LizardResult':
+        return LizardResult(function_info.filename, function_info.name, function_info.long_name,
+                            function_info.start_line, function_info.end_line,
+                            function_info.cyclomatic_complexity, function_info.nloc)
@@ -23,6 +23,18 @@ class LLMWrapperInterface(ABC):
     def received_tokens_count(self) -> int:
         pass
 
+    @property
+    @abstractmethod
+    def cached_sent_tokens_count(self) -> int:
+        """Part of sent_tokens_count answered from the response cache, not billed"""
+        pass
+
+    @property
+    @abstractmethod
+    def cached_received_tokens_count(self) -> int:
+        """Part of received_tokens_count answered from the response cache, not billed"""
+        pass
+
     @abstractmethod
     def send_message(self, prompt: str) -> str:
         pass
\ No newline at end of file
@@ -1,15 +1,24 @@
 from abc import ABC, abstractmethod
-import os
-import shutil
+import copy
+import time
 from .LintError import LintError
 from .TestError import TestError
 import re
 from pathlib import Path
+from helpers.WorkspaceHelper import create_workspace
+from util.Logger import get_logger
 
 
 class ProjectInterface(ABC):
+    __dirty_suffix: str = '-dirty'
     __dirty_path: str | None = None
     __target_path: str | None = None
+    test_impact_map = None
+    """Maps source lines to the test files covering them, see helpers/CoverageHelper. Set when test impact selection is enabled."""
+    baseline = None
+    """Lint errors and failing tests of the untouched project, see helpers/BaselineHelper. Set when enabled."""
+    verification_cache = None
+    """Lint and test results by state of the dirty workspace, see helpers/VerificationCache. Set when enabled."""
     # __linter_config: str | None = None
 
     @property
@@ -42,51 +51,92 @@ class ProjectInterface(ABC):
         """Optional code to be executed to prepare running tests (e. g. installing 3rd party libraries)"""
         pass
 
-    def __create_copy(self, path_suffix: str) -> str:
+    def __create_copy(self, path_suffix: str, install_dependencies: bool = True) -> str:
+        """Creates a workspace next to the project. Dependencies are only installed in workspaces
+        where linting or tests are run."""
         destination_path = self.path + path_suffix
 
-        if os.path.exists(destination_path):
-            shutil.rmtree(destination_path)
+        start = time.perf_counter()
+        method = create_workspace(self.path, destination_path)
+        provisioned = time.perf_counter()
 
-        path_of_copy = shutil.copytree(
-            self.path, destination_path, dirs_exist_ok=True, symlinks=True)
+        if install_dependencies:
+            self.after_copy_hook(path_suffix)
+        finished = time.perf_counter()
 
-        self.after_copy_hook(path_suffix)
+        get_logger().info("Created workspace {} via {} in {:.1f}s, dependencies {} in {:.1f}s".format(
+            destination_path, method, provisioned - start,
+            "installed" if install_dependencies else "skipped", finished - provisioned))
 
-        return path_of_copy
+        return destination_path
 
     @property
     def dirty_path(self) -> str:
         """The path to the 'dirty' copy of the project. This is where code is being manipulated and tested."""
         if self.__dirty_path is None:
-            self.__dirty_path = self.__create_copy('-dirty')
+            self.__dirty_path = self.__create_copy(self.__dirty_suffix)
 
         return self.__dirty_path
 
     @property
     def target_path(self) -> str:
-        """The path to the improved version of the project. This is where only verified changes are appplied."""
+        """The path to the improved version of the project. This is where only verified changes are appplied.
+        It is only patched and committed, so no dependencies are installed there."""
         if self.__target_path is None:
-            self.__target_path = self.__create_copy('-target')
+            self.__target_path = self.__create_copy('-target', install_dependencies=False)
 
         return self.__target_path
 
+    def create_worker_copy(self, worker_id: int) -> 'ProjectInterface':
+        """Returns a copy of the project with its own dirty workspace, sharing the target workspace.
+        Used to refactor and verify several functions at the same time."""
+        self.target_path
+
+        worker_copy = copy.copy(self)
+        worker_copy.__dirty_suffix = '-dirty-' + str(worker_id)
+        worker_copy.__dirty_path = None
+        return worker_copy
+
     def run_lint_fix(self, code: str) -> str:
         """Optional: Resolve automatically fixable linting errors before applying code changes"""
         return code
 
     @abstractmethod
-    def get_lint_errors(self) -> list[LintError]:
+    def get_lint_errors(self, files: list[str] | None = None) -> list[LintError]:
         """Checks source code for stylistic and programmatic errors and returns them.
-        If no errors were found it returns an empty list."""
+        If no errors were found it returns an empty list.
+        files (relative to the project root) may restrict linting to these files, see get_eslint_errors."""
         pass
 
     @abstractmethod
-    def get_test_errors(self) -> list[TestError]:
+    def get_test_errors(self, test_files: list[str] | None = None) -> list[TestError]:
         """Runs tests and returns list of failing tests.
-        If no test fails it returns an empty list."""
+        If no test fails it returns an empty list.
+        test_files (relative to the project root) restricts the run to these files, it is only passed
+        to projects which provide test_files_glob."""
         pass
 
+    @property
+    def test_files_glob(self) -> str | None:
+        """Optional: Glob matching the test files relative to the project root.
+        Projects providing it support running a subset of their tests (test impact selection)."""
+        return None
+
+    @property
+    def test_support_files_glob(self) -> str | None:
+        """Optional: Glob matching files which test_files_glob matches but are no tests (helpers, fixtures)."""
+        return None
+
+    @property
+    def supports_test_sharding(self) -> bool:
+        """Whether the test files (see test_files_glob) can run split across parallel processes.
+        Projects opt out when their tests share state (ports, files, databases) or the runner already runs in parallel."""
+        return True
+
+    def get_test_command(self, test_files: list[str] | None = None) -> str | None:
+        """Optional: The shell command running the given test files, used to collect their coverage."""
+        return None
+
     def get_test_case(self, error: TestError) -> None | str:
         """Returns the test code for a given failing test case."""
 
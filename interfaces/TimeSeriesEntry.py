@@ -3,7 +3,7 @@ from typing import TypedDict
 from typing import Literal
 from .NotImprovableException import Reason
 
-Result = Reason | Literal['success', 'other error']
+Result = Reason | Literal['success', 'timeout', 'other error']
 
 class TimeEntry(TypedDict):
     iteration: int
@@ -28,3 +28,7 @@ class TimeEntry(TypedDict):
     sent_tokens: int
     received_tokens: int
     result: Result
+    discarded_sent_tokens: int
+    discarded_received_tokens: int
+    cached_sent_tokens: int
+    cached_received_tokens: int
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 from interfaces.Function import Function
+from interfaces.LintError import LintError
+from interfaces.TestError import TestError
 
 
 class VerificationStrategyInterface(ABC):
@@ -12,15 +14,20 @@ class VerificationStrategyInterface(ABC):
         pass
     
     @abstractmethod
-    def verify_linting(self, function: Function):
-        """Runs linting and attempts to fix potentially occuring errors"""
+    def verify_linting(self, function: Function, lint_errors: list[LintError] | None = None):
+        """Runs linting (unless the errors of the current code are given) and attempts to fix potentially occuring errors"""
         pass
 
     @abstractmethod
-    def verify_tests(self, function: Function):
-        """Runs tests and attempts to fix potentially failing tests"""
+    def verify_tests(self, function: Function, test_errors: list[TestError] | None = None):
+        """Runs tests (unless the errors of the current code are given) and attempts to fix potentially failing tests"""
         pass
 
+    def verify_linting_and_tests(self, function: Function):
+        """Verifies linting, then tests. Strategies may run both at the same time."""
+        self.verify_linting(function)
+        self.verify_tests(function)
+
     @abstractmethod
     def verify_improvement(self, function: Function):
         """Compares CC of refactored with original function and attempts to further improve refactoring if not satisfactory"""
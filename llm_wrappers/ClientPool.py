@@ -0,0 +1,39 @@
+import importlib.util
+import threading
+from contextlib import contextmanager
+from openai import OpenAI, DefaultHttpxClient
+
+# HTTP/2 multiplexes concurrent requests over one connection, httpx needs the h2 package for it
+_http2_available = importlib.util.find_spec('h2') is not None
+
+_clients: dict[tuple[str | None, str], OpenAI] = {}
+_clients_lock = threading.Lock()
+_request_slots: threading.BoundedSemaphore | None = None
+
+
+def get_openai_client(api_key: str, base_url: str | None = None) -> OpenAI:
+    """Client shared by all wrappers sending to the base URL, so its connection pool (and TLS sessions)
+    is reused across functions instead of being set up for every one of them"""
+    with _clients_lock:
+        client = _clients.get((base_url, api_key))
+        if client is None:
+            client = OpenAI(api_key=api_key, base_url=base_url,
+                            http_client=DefaultHttpxClient(http2=_http2_available))
+            _clients[(base_url, api_key)] = client
+        return client
+
+
+def set_max_concurrent_requests(max_requests: int | None) -> None:
+    """Limits the requests in flight across all wrappers and threads, None does not limit them"""
+    global _request_slots
+    _request_slots = None if max_requests is None else threading.BoundedSemaphore(max_requests)
+
+
+@contextmanager
+def request_slot():
+    slots = _request_slots
+    if slots is None:
+        yield
+        return
+    with slots:
+        yield
@@ -11,4 +11,4 @@ class GoogleTokenCounter(TokenCounter):
         self.model = model
 
     def count_tokens(self, message: str) -> int:
-        return self.client.models.count_tokens(model=self.model, contents=message)
\ No newline at end of file
+        return self.client.models.count_tokens(model=self.model, contents=message).total_tokens
\ No newline at end of file
@@ -1,9 +1,11 @@
 from interfaces.LlmWrapperInterface import LLMWrapperInterface
 import json
 from pathlib import Path
-from openai import OpenAI, RateLimitError
+from openai import RateLimitError
 import time
 from llm_wrappers.TokenCounter import TokenCounter
+from llm_wrappers.ClientPool import get_openai_client, request_slot
+from llm_wrappers.ResponseCache import ResponseCache, CachedResponse, get_response_cache
 from util.Logger import get_logger
 from random import randint
 
@@ -25,10 +27,21 @@ class OpenAIAPIWrapper(LLMWrapperInterface):
         self.log_path = log_path
         self.max_context_length = max_context_length
         self.messages: list[dict[str, str]] = []
-        self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+        # tokens of each message as counted by the token counter, kept beside messages
+        self.message_token_counts: list[int] = []
+        self.__messages_token_count = 0
+        # prompt tokens reported by the API and the counted tokens of the same contexts
+        self.__reported_prompt_tokens = 0
+        self.__counted_prompt_tokens = 0
+        self.client = get_openai_client(self.api_key, base_url)
         self.token_counter = token_counter
+        # passed to the chat completion, part of the key of cached responses
+        self.generation_parameters: dict = {}
+        self.response_cache = get_response_cache()
         self.__sent_tokens_count = 0
         self.__received_tokens_count = 0
+        self.__cached_sent_tokens_count = 0
+        self.__cached_received_tokens_count = 0
     
     @property
     def model(self):
@@ -42,20 +55,38 @@ class OpenAIAPIWrapper(LLMWrapperInterface):
     def received_tokens_count(self):
         return self.__received_tokens_count
 
-    def __add_message(self, role: str, content: str):
+    @property
+    def cached_sent_tokens_count(self):
+        return self.__cached_sent_tokens_count
+
+    @property
+    def cached_received_tokens_count(self):
+        return self.__cached_received_tokens_count
+
+    def __add_message(self, role: str, content: str, token_count: int):
         self.messages.append({"role": role, "content": content})
+        self.message_token_counts.append(token_count)
+        self.__messages_token_count += token_count
+
+    def __calibrated(self, token_count: int) -> float:
+        """Token count scaled by how far the counter was off from the API so far, e. g. for message overhead"""
+        if self.__counted_prompt_tokens == 0:
+            return token_count
+        return token_count * self.__reported_prompt_tokens / self.__counted_prompt_tokens
 
-    def __get_context(self, prompt: str) -> list:
+    def __get_context(self, prompt: str, prompt_token_count: int) -> tuple[list, int]:
+        """Messages to send and their counted tokens, leaving out the oldest messages beyond the context length"""
         context = self.messages + [{"role": "user", "content": prompt}]
+        context_length = self.__messages_token_count + prompt_token_count
 
-        context_length = self.token_counter.get_context_length(context)
+        removed = 0
         if self.max_context_length > 0:
-            while context_length > self.max_context_length and len(context) > 1:
+            while self.__calibrated(context_length) > self.max_context_length and removed < len(self.messages):
                 # Remove oldest message until within length limit
-                context.pop(0)
-                context_length = self.__get_context_length(context)
+                context_length -= self.message_token_counts[removed]
+                removed += 1
 
-        return context
+        return context[removed:], context_length
 
     def __save_history_to_json(self):
         try:
@@ -68,23 +99,23 @@ class OpenAIAPIWrapper(LLMWrapperInterface):
             print(
                 f"Failed to save message history to {self.log_path}: {e}")
 
-    def send_message(self, prompt: str):
-        context = self.__get_context(prompt)
-
+    def __request_completion(self, context: list, context_length: int) -> CachedResponse:
         was_completion_successful = False
         base_delay = 5
         while not was_completion_successful:
             try:
-                completion = self.client.chat.completions.create(
-                    model=self.__model,
-                    messages=context
-                )
+                with request_slot():
+                    completion = self.client.chat.completions.create(
+                        model=self.__model,
+                        messages=context,
+                        **self.generation_parameters
+                    )
                 was_completion_successful = True
             
             except RateLimitError as e:
                 delay = base_delay + randint(1, 5)
                 get_logger().error("Rate limit error: " + e.message)
-                get_logger().error("Context length: " + self.__get_context_length(context))
+                get_logger().error("Context length: " + str(context_length))
                 if base_delay > 60:
                     get_logger().fatal("Failed to get answer from OpenAI.")
                     raise Exception("Failed to get answer from OpenAI.")
@@ -92,13 +123,41 @@ class OpenAIAPIWrapper(LLMWrapperInterface):
                 time.sleep(delay)
                 base_delay +=5
 
-        self.__sent_tokens_count += completion.usage.prompt_tokens
+        usage = completion.usage
+        return {
+            'content': str(completion.choices[0].message.content),
+            'prompt_tokens': usage.prompt_tokens if usage is not None else 0,
+            'completion_tokens': usage.completion_tokens if usage is not None else 0
+        }
 
-        response_content = str(completion.choices[0].message.content)
-        self.__received_tokens_count += completion.usage.completion_tokens
-
-        self.__add_message("user", prompt)
-        self.__add_message("assistant", response_content)
+    def send_message(self, prompt: str):
+        prompt_token_count = self.token_counter.count_tokens(prompt)
+        context, context_length = self.__get_context(prompt, prompt_token_count)
+
+        response = None
+        if self.response_cache is not None:
+            key = ResponseCache.get_key(self.__model, self.generation_parameters, context)
+            response = self.response_cache.get(key)
+            if response is not None:
+                # counted as usage as well, so runs replayed from the cache report the same totals
+                self.__cached_sent_tokens_count += response['prompt_tokens']
+                self.__cached_received_tokens_count += response['completion_tokens']
+
+        if response is None:
+            response = self.__request_completion(context, context_length)
+            if self.response_cache is not None:
+                self.response_cache.put(key, self.__model, response)
+
+        self.__sent_tokens_count += response['prompt_tokens']
+        self.__received_tokens_count += response['completion_tokens']
+        response_content = response['content']
+
+        if response['prompt_tokens'] > 0 and context_length > 0:
+            self.__reported_prompt_tokens += response['prompt_tokens']
+            self.__counted_prompt_tokens += context_length
+
+        self.__add_message("user", prompt, prompt_token_count)
+        self.__add_message("assistant", response_content, self.token_counter.count_tokens(response_content))
         self.__save_history_to_json()
 
         return response_content
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Literal, TypedDict
+
+CacheMode = Literal['off', 'read-through', 'replay']
+
+
+class ResponseCacheMiss(Exception):
+    pass
+
+
+class CachedResponse(TypedDict):
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class ResponseCache:
+    """Responses of the LLM stored in a SQLite database, keyed by model, generation parameters and the exact
+    messages sent. With read-through, misses are sent and stored. With replay, a miss raises ResponseCacheMiss,
+    so a run can be repeated without reaching the API."""
+
+    def __init__(self, path: str, mode: CacheMode = 'read-through'):
+        self.mode = mode
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__lock, self.__connection:
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS responses ('
+                                      'key TEXT PRIMARY KEY, model TEXT, content TEXT, '
+                                      'prompt_tokens INTEGER, completion_tokens INTEGER)')
+
+    @staticmethod
+    def get_key(model: str, parameters: dict, messages: list[dict[str, str]]) -> str:
+        request = json.dumps({'model': model, 'parameters': parameters, 'messages': messages}, sort_keys=True)
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT content, prompt_tokens, completion_tokens FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            if self.mode == 'replay':
+                raise ResponseCacheMiss("No cached response for request " + key)
+            return None
+        return {'content': row[0], 'prompt_tokens': row[1], 'completion_tokens': row[2]}
+
+    def put(self, key: str, model: str, response: CachedResponse) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                                      (key, model, response['content'],
+                                       response['prompt_tokens'], response['completion_tokens']))
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
+
+
+_response_cache: ResponseCache | None = None
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """Cache used by all LLM wrappers created afterwards, None sends every request"""
+    global _response_cache
+    _response_cache = cache
+
+
+def get_response_cache() -> ResponseCache | None:
+    return _response_cache
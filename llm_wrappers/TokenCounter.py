@@ -1,6 +1,4 @@
-import operator
 from abc import ABC, abstractmethod
-from functools import reduce
 
 
 class TokenCounter(ABC):
@@ -10,8 +8,6 @@ class TokenCounter(ABC):
         pass
 
     def get_context_length(self, context: list[dict[str, str]]) -> int:
-        tokenized_messages = list([self.count_tokens(msg["content"])] for msg in context)
-        tokens_per_message = list(len(tokens) for tokens in tokenized_messages)
-
-        context_length = reduce(operator.add, tokens_per_message)
-        return context_length
\ No newline at end of file
+        """Tokens of all messages of the context, tokenizing each of them.
+        Wrappers keeping a conversation should store the count of each message instead of calling this on every turn."""
+        return sum(self.count_tokens(msg["content"]) for msg in context)
\ No newline at end of file
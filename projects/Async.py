@@ -25,9 +25,9 @@ class Async(ProjectInterface):
 
         return fixed_code
 
-    def get_lint_errors(self):
+    def get_lint_errors(self, files=None):
         lint_command = 'npx eslint .'
-        errors = get_eslint_errors(self.dirty_path, lint_command)
+        errors = get_eslint_errors(self.dirty_path, lint_command, files)
 
         return errors
 
@@ -24,14 +24,23 @@ class Compromise(ProjectInterface):
 
         return fixed_code
 
-    def get_lint_errors(self):
+    def get_lint_errors(self, files=None):
         lint_command = 'npx eslint src'
-        errors = get_eslint_errors(self.dirty_path, lint_command)
+        errors = get_eslint_errors(self.dirty_path, lint_command, files)
 
         return errors
 
-    def get_test_errors(self):
-        test_command = 'npx tape "./tests/**/*.test.js"'
+    @property
+    def test_files_glob(self):
+        return 'tests/**/*.test.js'
+
+    def get_test_command(self, test_files=None):
+        if test_files is None:
+            return 'npx tape "./tests/**/*.test.js"'
+        return 'npx tape ' + ' '.join(test_files)
+
+    def get_test_errors(self, test_files=None):
+        test_command = self.get_test_command(test_files)
         line_pattern = r'Test.<anonymous> \((\S+compromise\D+):(\d+):\d+\)'
         errors = get_tap_errors(self.dirty_path, test_command, line_pattern)
 
@@ -24,14 +24,29 @@ class Joi(ProjectInterface):
 
         return fixed_code
 
-    def get_lint_errors(self):
+    def get_lint_errors(self, files=None):
         lint_command = 'npx eslint .'
-        errors = get_eslint_errors(self.dirty_path, lint_command)
+        errors = get_eslint_errors(self.dirty_path, lint_command, files)
 
         return errors
 
-    def get_test_errors(self):
+    @property
+    def test_files_glob(self):
+        return 'test/**/*.js'
+
+    @property
+    def test_support_files_glob(self):
+        # shared by the test files, lab reports no tests when it runs alone
+        return 'test/helper.js'
+
+    def get_test_command(self, test_files=None):
         test_command = 'npx lab -r tap'
+        if test_files is not None:
+            test_command += ' ' + ' '.join(test_files)
+        return test_command
+
+    def get_test_errors(self, test_files=None):
+        test_command = self.get_test_command(test_files)
         line_pattern = r'at (\S+joi\D+):(\d+):\d+'
         errors = get_tap_errors(self.dirty_path, test_command, line_pattern)
 
@@ -29,14 +29,24 @@ class Ramda(ProjectInterface):
 
         return fixed_code
 
-    def get_lint_errors(self):
+    def get_lint_errors(self, files=None):
         lint_command = 'npx eslint scripts/bookmarklet scripts/*.js source/*.js source/internal/*.js test/*.js test/**/*.js lib/sauce/*.js lib/bench/*.js'
-        errors = get_eslint_errors(self.dirty_path, lint_command)
+        errors = get_eslint_errors(self.dirty_path, lint_command, files)
 
         return errors
 
-    def get_test_errors(self):
-        test_command = 'npx cross-env BABEL_ENV=cjs mocha --require @babel/register' 
+    @property
+    def test_files_glob(self):
+        return 'test/*.js'
+
+    def get_test_command(self, test_files=None):
+        test_command = 'npx cross-env BABEL_ENV=cjs mocha --require @babel/register'
+        if test_files is not None:
+            test_command += ' ' + ' '.join(test_files)
+        return test_command
+
+    def get_test_errors(self, test_files=None):
+        test_command = self.get_test_command(test_files)
         line_pattern = r' *at Context.<anonymous> \(\D+:(\d+):\d+\)'
 
         errors = get_mocha_errors(self.dirty_path, test_command, line_pattern)
@@ -25,14 +25,29 @@ class Svgo(ProjectInterface):
 
         return fixed_code
 
-    def get_lint_errors(self):
+    def get_lint_errors(self, files=None):
         lint_command = 'npx eslint .'
-        errors = get_eslint_errors(self.dirty_path, lint_command)
+        errors = get_eslint_errors(self.dirty_path, lint_command, files)
 
         return errors
 
-    def get_test_errors(self):
+    @property
+    def test_files_glob(self):
+        return '**/*.test.js'
+
+    @property
+    def supports_test_sharding(self):
+        # the runner already spreads the test files across processes
+        return False
+
+    def get_test_command(self, test_files=None):
         test_command = 'npx cross-env NODE_OPTIONS=--experimental-vm-modules jest'
+        if test_files is not None:
+            test_command += ' ' + ' '.join(test_files)
+        return test_command
+
+    def get_test_errors(self, test_files=None):
+        test_command = self.get_test_command(test_files)
         line_pattern = r' *at Object.<anonymous> \(\S+svgo\D+:(\d+):\d+\)'
 
         errors = get_jest_errors(self.dirty_path, test_command, line_pattern)
@@ -6,33 +6,57 @@ from interfaces.NotImprovableException import NotImprovableException
 class ChoiEtAl(VerificationStrategyInterface):
     """Verification methods adapted to JavaScript, taken from Choi, Jinsu et al. 2024: 'Iterative Refactoring of Real-World Open-Source Programs with Large Language Models'"""
 
+    def __init__(self, concurrent: bool = False):
+        """With concurrent, linting and tests run at the same time on the same code.
+        Lint errors are still fixed first, tests run again only if fixing them changed the code."""
+        self.concurrent = concurrent
+
     @property
     def name(self):
         return "Choi et al."
 
-    def verify_linting(self, function):
-        lint_errors = function.project.get_lint_errors()
+    def verify_linting(self, function, lint_errors=None):
+        if lint_errors is None:
+            lint_errors = function.get_lint_errors()
         number_linting_errors = len(lint_errors)
 
         if number_linting_errors > 0:
             get_logger().info("Linting does not pass, {} error(s), attempting to fix".format(number_linting_errors))
             function.refactor_with_lint_errors(lint_errors)
 
-            lint_errors = function.project.get_lint_errors()
+            lint_errors = function.get_lint_errors()
             number_linting_errors = len(lint_errors)
             if number_linting_errors > 0:
                 raise NotImprovableException(function, "failed linting: {} error(s)".format(number_linting_errors))
 
-    def verify_tests(self, function):
-        test_errors = function.project.get_test_errors()
+    def __verify_linting_and_get_test_errors__(self, function, previous_test_errors=None):
+        """Verifies linting and returns the test errors of the code that passed it"""
+        if not self.concurrent:
+            self.verify_linting(function)
+            return function.get_test_errors(previous_errors=previous_test_errors)
+
+        code_version = len(function.history)
+        lint_errors, test_errors = function.get_lint_and_test_errors(previous_test_errors)
+        self.verify_linting(function, lint_errors)
+        if len(function.history) != code_version:
+            # the tests ran on the code before the lint fix
+            return function.get_test_errors(previous_errors=previous_test_errors)
+        return test_errors
+
+    def verify_linting_and_tests(self, function):
+        test_errors = self.__verify_linting_and_get_test_errors__(function)
+        self.verify_tests(function, test_errors)
+
+    def verify_tests(self, function, test_errors=None):
+        if test_errors is None:
+            test_errors = function.get_test_errors()
         number_test_errors = len(test_errors)
 
         if number_test_errors > 0:
             get_logger().info("Tests do not pass, {} error(s), attempting to fix".format(number_test_errors))
             function.refactor_with_test_errors(test_errors)
-            self.verify_linting(function)
 
-            test_errors = function.project.get_test_errors()
+            test_errors = self.__verify_linting_and_get_test_errors__(function, previous_test_errors=test_errors)
             number_test_errors = len(test_errors) 
             if number_test_errors > 0:
                 raise NotImprovableException(function, "failed tests: {} error(s)".format(number_test_errors))
@@ -43,8 +67,7 @@ class ChoiEtAl(VerificationStrategyInterface):
         if not is_improved:
             get_logger().info("Improvement is not satisfying, attempting to fix")
             function.refactor_for_better_improvement()
-            self.verify_linting(function)
-            self.verify_tests(function)
+            self.verify_linting_and_tests(function)
 
             is_improved = function.new_cc < function.old_cc
             if not is_improved: